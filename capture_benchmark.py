@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""Stress the capture path without a camera.
+
+Runs the capture, encode, write and index bookkeeping path as fast as possible
+(or at a compressed interval) using a synthetic or replay capture source.
+
+Example:
+    python3 capture_benchmark.py --source synthetic --frames 500
+    python3 capture_benchmark.py --source replay --source-path projects/pilz --interval-ms 100
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import os
+import statistics
+import time
+from pathlib import Path
+from typing import Any
+
+from modules.camera_capture import CameraCapture
+from modules.program_state import ProgramState
+from modules.project_manager import ProjectManager
+
+
+BASE_DIR = Path(__file__).resolve().parent
+CONFIG_PATH = BASE_DIR / "config.json"
+
+
+def load_config(source: str, source_path: str | None, projects_folder: str | None) -> dict[str, Any]:
+    with open(CONFIG_PATH, "r", encoding="utf-8") as config_file:
+        config: dict[str, Any] = json.load(config_file)
+
+    config["capture_source"] = source
+    config["capture_source_path"] = source_path
+    config["capture_source_fps"] = 0
+
+    folder = Path(projects_folder or config["projects_folder"])
+    if not folder.is_absolute():
+        folder = BASE_DIR / folder
+    config["projects_folder"] = str(folder)
+    return config
+
+
+def prepare_recording_project(project_manager: ProjectManager, state: ProgramState, project: str) -> None:
+    """Points the recording state at the benchmark project, continuing after existing frames."""
+    project_manager.ensure_directory_exists(os.path.join(project_manager.config["projects_folder"], project))
+    project_manager.get_projects()
+
+    state.project_name_record = project
+    state.base_url_record = project_manager.project_image_base_path(project)
+    state.img_indices_record = state.projects_dict[project]["indices"]
+    state.img_index_record = state.img_indices_record[-1] + 1 if state.img_indices_record else 0
+
+
+def run_benchmark(
+    config: dict[str, Any],
+    project: str,
+    frames: int,
+    interval_ms: float,
+    simulated_interval: float,
+    quiet: bool,
+) -> None:
+    state = ProgramState()
+    project_manager = ProjectManager(config, state)
+    prepare_recording_project(project_manager, state, project)
+    camera_capture = CameraCapture(config, state)
+
+    latencies: list[float] = []
+    failed = 0
+    first_index = state.img_index_record
+    start_time = time.perf_counter()
+    next_capture_time = start_time
+
+    devnull = open(os.devnull, "w", encoding="utf-8")
+    try:
+        for frame_number in range(frames):
+            if interval_ms > 0:
+                delay = next_capture_time - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                next_capture_time += interval_ms / 1000.0
+
+            # Stamp the time the frame would have had at the simulated capture interval.
+            elapsed_time = int((first_index + frame_number) * simulated_interval)
+            capture_start = time.perf_counter()
+            with contextlib.redirect_stdout(devnull) if quiet else contextlib.nullcontext():
+                saved = camera_capture.capture_image(elapsed_time)
+            if saved:
+                project_manager.record_captured_frame()
+                latencies.append(time.perf_counter() - capture_start)
+            else:
+                failed += 1
+        # Frames are encoded and written in the background; include the backlog in the total.
+        camera_capture.writer.flush()
+        total_seconds = time.perf_counter() - start_time
+        failed += camera_capture.writer.failed_frames
+    finally:
+        devnull.close()
+        camera_capture.cleanup()
+
+    saved_frames = len(latencies) - camera_capture.writer.failed_frames
+    written_bytes = camera_capture.writer.written_bytes
+
+    print(f"Project: {project}")
+    print(f"Frames saved: {saved_frames} (failed: {failed})")
+    print(f"Total time: {total_seconds:.2f} s")
+    if latencies:
+        latencies_ms = sorted(latency * 1000.0 for latency in latencies)
+        print(f"Throughput: {saved_frames / total_seconds:.1f} frames/s, {written_bytes / total_seconds / 1e6:.1f} MB/s")
+        print(f"Capture latency (read, stamp, queue): median {statistics.median(latencies_ms):.1f} ms, "
+              f"p95 {latencies_ms[int(0.95 * (len(latencies_ms) - 1))]:.1f} ms, "
+              f"max {latencies_ms[-1]:.1f} ms")
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Capture frames from a synthetic or replay source into a project and report throughput."
+    )
+    parser.add_argument(
+        "--source",
+        choices=["synthetic", "replay"],
+        default="synthetic",
+        help="Capture source to read from (default: synthetic).",
+    )
+    parser.add_argument(
+        "--source-path",
+        help="Project directory or video file to replay (required for --source replay).",
+    )
+    parser.add_argument(
+        "--project",
+        default="benchmark",
+        help="Project to write the frames into (default: benchmark).",
+    )
+    parser.add_argument(
+        "--projects-folder",
+        help="Base folder for projects (default: projects_folder from config.json).",
+    )
+    parser.add_argument(
+        "--frames",
+        type=int,
+        default=200,
+        help="Number of frames to capture (default: 200).",
+    )
+    parser.add_argument(
+        "--interval-ms",
+        type=float,
+        default=0.0,
+        help="Capture interval in milliseconds; 0 captures as fast as possible (default: 0).",
+    )
+    parser.add_argument(
+        "--simulated-interval",
+        type=float,
+        help="Seconds between frames used for the timestamp pixels (default: capture_interval from config.json).",
+    )
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Print a line for every saved frame.",
+    )
+    return parser
+
+
+def main() -> int:
+    parser = build_arg_parser()
+    args = parser.parse_args()
+
+    if args.frames <= 0:
+        parser.error("--frames must be > 0")
+    if args.source == "replay" and not args.source_path:
+        parser.error("--source-path is required for --source replay")
+
+    config = load_config(args.source, args.source_path, args.projects_folder)
+    run_benchmark(
+        config=config,
+        project=args.project,
+        frames=args.frames,
+        interval_ms=args.interval_ms,
+        simulated_interval=args.simulated_interval or config["capture_interval"],
+        quiet=not args.verbose,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
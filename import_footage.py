@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""Import a video file or a directory of photos as a new project.
+
+Frames are resized to the configured width/height, stamped with the same
+timestamp pixels the recorder writes and saved as image_<n>.jpg together
+with their timestamps and a catalog, so the project plays back and seeks
+right away. Decoding,
+resizing and encoding run in a process pool.
+
+Photos are ordered by their EXIF capture time (file modification time as a
+fallback, or a fixed --interval). Video frames use their position in the video.
+
+Example:
+    python3 import_footage.py garden ~/Videos/garden.mp4 --step 30
+    python3 import_footage.py hike ~/Pictures/hike/
+    python3 import_footage.py scans ~/scans/ --interval 60 --workers 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import struct
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import cv2
+
+from modules.camera_capture import CameraCapture
+from modules.project_catalog import ProjectCatalog
+from modules.timestamp_index import TimestampIndex
+
+
+BASE_DIR = Path(__file__).resolve().parent
+CONFIG_PATH = BASE_DIR / "config.json"
+JPG_EXT = ".jpg"
+PHOTO_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff"}
+EXIF_READ_BYTES = 256 * 1024
+EXIF_TAG_DATETIME = 0x0132
+EXIF_TAG_EXIF_IFD = 0x8769
+EXIF_TAG_DATETIME_ORIGINAL = 0x9003
+VIDEO_CHUNK_FRAMES = 600
+PHOTO_CHUNK_SIZE = 8
+
+
+def read_exif_capture_time(path: Path) -> float | None:
+    """Returns the EXIF capture time of a JPEG as a Unix timestamp, if present."""
+    with open(path, "rb") as photo_file:
+        data = photo_file.read(EXIF_READ_BYTES)
+    if data[:2] != b"\xff\xd8":
+        return None
+
+    offset = 2
+    try:
+        while offset + 4 <= len(data) and data[offset] == 0xFF:
+            marker = data[offset + 1]
+            if marker in (0xD9, 0xDA):  # End of image or start of scan: no EXIF segment.
+                return None
+            (length,) = struct.unpack_from(">H", data, offset + 2)
+            segment = data[offset + 4:offset + 2 + length]
+            if marker == 0xE1 and segment[:6] == b"Exif\0\0":
+                return _parse_exif_datetime(segment[6:])
+            offset += 2 + length
+    except struct.error:
+        return None
+    return None
+
+
+def _parse_exif_datetime(tiff: bytes) -> float | None:
+    byte_order = {b"II": "<", b"MM": ">"}.get(tiff[:2])
+    if byte_order is None:
+        return None
+
+    def ifd_entries(ifd_offset: int) -> list[tuple[int, int, int]]:
+        (count,) = struct.unpack_from(f"{byte_order}H", tiff, ifd_offset)
+        entries = []
+        for entry_number in range(count):
+            tag, _type, value_count, value = struct.unpack_from(
+                f"{byte_order}HHII", tiff, ifd_offset + 2 + 12 * entry_number
+            )
+            entries.append((tag, value_count, value))
+        return entries
+
+    def ascii_value(value_count: int, value_offset: int) -> str:
+        return tiff[value_offset:value_offset + value_count].rstrip(b"\0").decode("ascii", "ignore")
+
+    date_time = None
+    exif_ifd_offset = None
+    (ifd0_offset,) = struct.unpack_from(f"{byte_order}I", tiff, 4)
+    for tag, value_count, value in ifd_entries(ifd0_offset):
+        if tag == EXIF_TAG_DATETIME:
+            date_time = ascii_value(value_count, value)
+        elif tag == EXIF_TAG_EXIF_IFD:
+            exif_ifd_offset = value
+
+    if exif_ifd_offset is not None:
+        for tag, value_count, value in ifd_entries(exif_ifd_offset):
+            if tag == EXIF_TAG_DATETIME_ORIGINAL:
+                date_time = ascii_value(value_count, value)
+                break
+
+    if not date_time:
+        return None
+    try:
+        return time.mktime(time.strptime(date_time, "%Y:%m:%d %H:%M:%S"))
+    except ValueError:
+        return None
+
+
+def fit_frame(frame: Any, width: int, height: int) -> Any:
+    """Scales a frame to cover width x height and crops the overlap, keeping the aspect ratio."""
+    frame_height, frame_width = frame.shape[:2]
+    scale = max(width / frame_width, height / frame_height)
+    scaled_width = max(width, round(frame_width * scale))
+    scaled_height = max(height, round(frame_height * scale))
+    interpolation = cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR
+    frame = cv2.resize(frame, (scaled_width, scaled_height), interpolation=interpolation)
+    top = (scaled_height - height) // 2
+    left = (scaled_width - width) // 2
+    return frame[top:top + height, left:left + width].copy()
+
+
+def _init_worker() -> None:
+    # The pool already uses every core; OpenCV's own threads would only compete.
+    cv2.setNumThreads(1)
+
+
+def _write_frame(frame: Any, output_path: str, elapsed_time: int, settings: dict[str, Any]) -> None:
+    frame = fit_frame(frame, settings["width"], settings["height"])
+    CameraCapture.stamp_timestamp(frame, elapsed_time, settings["pixels_for_timestamp"])
+    cv2.imwrite(output_path, frame, [cv2.IMWRITE_JPEG_QUALITY, CameraCapture.JPEG_QUALITY])
+
+
+def import_photo(task: tuple[str, str, int, dict[str, Any]]) -> bool:
+    source_path, output_path, elapsed_time, settings = task
+    frame = cv2.imread(source_path)
+    if frame is None:
+        return False
+    _write_frame(frame, output_path, elapsed_time, settings)
+    return True
+
+
+def import_video_chunk(task: tuple[str, int, int, int, float, str, dict[str, Any]]) -> list[tuple[int, int]]:
+    """Imports every step-th frame of a range of a video; returns (index, elapsed seconds) pairs."""
+    video_path, start_frame, end_frame, step, fps, base_path, settings = task
+    video = cv2.VideoCapture(video_path)
+    video.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+
+    written = []
+    for frame_number in range(start_frame, end_frame):
+        # grab() skips frames without the cost of decoding them.
+        if frame_number % step != 0:
+            if not video.grab():
+                break
+            continue
+        ret, frame = video.read()
+        if not ret:
+            break
+        index = frame_number // step
+        elapsed_time = int(frame_number / fps)
+        _write_frame(frame, f"{base_path}{index}{JPG_EXT}", elapsed_time, settings)
+        written.append((index, elapsed_time))
+    video.release()
+    return written
+
+
+def collect_photos(source_dir: Path, interval: float | None) -> list[tuple[Path, int]]:
+    """Returns the photos of a directory in capture order with their elapsed seconds."""
+    photos = [entry for entry in source_dir.iterdir() if entry.is_file() and entry.suffix.lower() in PHOTO_EXTENSIONS]
+    if interval is not None:
+        photos.sort(key=lambda photo: photo.name)
+        return [(photo, int(position * interval)) for position, photo in enumerate(photos)]
+
+    timed_photos = []
+    for photo in photos:
+        capture_time = read_exif_capture_time(photo) if photo.suffix.lower() in {".jpg", ".jpeg"} else None
+        timed_photos.append((capture_time if capture_time is not None else photo.stat().st_mtime, photo.name, photo))
+    timed_photos.sort()
+    if not timed_photos:
+        return []
+    first_time = timed_photos[0][0]
+    return [(photo, int(capture_time - first_time)) for capture_time, _, photo in timed_photos]
+
+
+def check_elapsed_range(last_elapsed_time: int, source: Path) -> None:
+    """Raises an error if the footage spans more time than the timestamp pixels can hold."""
+    if last_elapsed_time > CameraCapture.MAX_ELAPSED_SECONDS:
+        raise RuntimeError(
+            f"{source} spans {last_elapsed_time / CameraCapture.SECONDS_PER_DAY:.1f} days, but frame timestamps hold less than "
+            f"{(CameraCapture.MAX_ELAPSED_SECONDS + 1) // CameraCapture.SECONDS_PER_DAY} days; split it into several projects."
+        )
+
+
+def write_catalog(project_dir: Path, timestamps: dict[int, int]) -> None:
+    """Stores the timestamps and frame delta, so the project needs no frame delta inference or timestamp scan."""
+    if not timestamps:
+        return
+    indices = sorted(timestamps)
+    TimestampIndex.save_stored(str(project_dir), timestamps)
+    if len(indices) > 1:
+        span_seconds = timestamps[indices[-1]] - timestamps[indices[0]]
+        ProjectCatalog(str(project_dir.parent)).update(
+            project_dir.name, **ProjectCatalog.frame_delta_values(max(span_seconds, 1) / (len(indices) - 1), indices)
+        )
+
+
+def import_footage(
+    source: Path,
+    project_dir: Path,
+    prefix: str,
+    settings: dict[str, Any],
+    workers: int | None,
+    step: int,
+    interval: float | None,
+) -> None:
+    base_path = str(project_dir / prefix)
+    start_time = time.perf_counter()
+    timestamps: dict[int, int] = {}
+
+    # Everything that can be checked up front is, so a bad source fails before any frame is written.
+    is_photo_import = source.is_dir()
+    if is_photo_import:
+        photos = collect_photos(source, interval)
+        check_elapsed_range(max((elapsed_time for _, elapsed_time in photos), default=0), source)
+        print(f"Importing {len(photos)} photos from {source}")
+        photo_tasks = [
+            (str(photo), f"{base_path}{index}{JPG_EXT}", elapsed_time, settings)
+            for index, (photo, elapsed_time) in enumerate(photos)
+        ]
+    else:
+        video = cv2.VideoCapture(str(source))
+        if not video.isOpened():
+            raise RuntimeError(f"Cannot open video: {source}")
+        frame_count = int(video.get(cv2.CAP_PROP_FRAME_COUNT))
+        fps = video.get(cv2.CAP_PROP_FPS) or 30.0
+        video.release()
+        check_elapsed_range(int(max(frame_count - 1, 0) / fps), source)
+        print(f"Importing every {step}. of {frame_count} frames ({fps:.1f} fps) from {source}")
+
+        # Chunks start on a multiple of the step so every chunk keeps the same frame grid.
+        chunk_frames = max(step, VIDEO_CHUNK_FRAMES // step * step)
+        video_tasks = [
+            (str(source), start, min(start + chunk_frames, frame_count), step, fps, base_path, settings)
+            for start in range(0, frame_count, chunk_frames)
+        ]
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            if is_photo_import:
+                for index, imported in enumerate(pool.map(import_photo, photo_tasks, chunksize=PHOTO_CHUNK_SIZE)):
+                    if imported:
+                        timestamps[index] = photo_tasks[index][2]
+                    else:
+                        print(f"Skipped unreadable photo: {photo_tasks[index][0]}")
+            else:
+                for written in pool.map(import_video_chunk, video_tasks):
+                    timestamps.update(written)
+    finally:
+        # Frames finished before an error keep their timestamps, so a partial import still plays and seeks.
+        write_catalog(project_dir, timestamps)
+
+    total_seconds = time.perf_counter() - start_time
+    if not timestamps:
+        print("No frames were imported.")
+        return
+    print(f"Imported {len(timestamps)} frames into {project_dir} in {total_seconds:.1f} s "
+          f"({len(timestamps) / total_seconds:.1f} frames/s)")
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Import a video file or a directory of photos as a new timelapse project."
+    )
+    parser.add_argument(
+        "project",
+        help="Name of the new project inside the projects folder.",
+    )
+    parser.add_argument(
+        "source",
+        help="Video file or directory of photos to import.",
+    )
+    parser.add_argument(
+        "--projects-folder",
+        help="Base folder for projects (default: projects_folder from config.json).",
+    )
+    parser.add_argument(
+        "--prefix",
+        default="image_",
+        help="Image filename prefix (default: image_).",
+    )
+    parser.add_argument(
+        "--step",
+        type=int,
+        default=1,
+        help="Import every n-th frame of a video (default: 1).",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        help="Seconds between photos; ignores EXIF times and orders photos by name.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Number of worker processes (default: number of CPUs).",
+    )
+    return parser
+
+
+def main() -> int:
+    parser = build_arg_parser()
+    args = parser.parse_args()
+
+    with open(CONFIG_PATH, "r", encoding="utf-8") as config_file:
+        config: dict[str, Any] = json.load(config_file)
+    settings = {key: config[key] for key in ("width", "height", "pixels_for_timestamp")}
+
+    source = Path(args.source).expanduser().resolve()
+    if not source.exists():
+        parser.error(f"Source does not exist: {source}")
+    if args.step <= 0:
+        parser.error("--step must be > 0")
+    if args.interval is not None and args.interval <= 0:
+        parser.error("--interval must be > 0")
+
+    projects_folder = Path(args.projects_folder or config["projects_folder"])
+    if not projects_folder.is_absolute():
+        projects_folder = BASE_DIR / projects_folder
+    project_dir = projects_folder / args.project
+    if project_dir.exists() and any(entry.name.startswith(args.prefix) for entry in project_dir.iterdir()):
+        parser.error(f"Project already contains frames: {project_dir}")
+    os.makedirs(project_dir, exist_ok=True)
+
+    try:
+        import_footage(
+            source=source,
+            project_dir=project_dir,
+            prefix=args.prefix,
+            settings=settings,
+            workers=args.workers,
+            step=args.step,
+            interval=args.interval,
+        )
+    except RuntimeError as exc:
+        print(f"Error: {exc}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,6 +1,8 @@
-import cv2
 from typing import Any
 
+from modules.capture_sources import CaptureSource, create_capture_source
+from modules.frame_writer import FrameWriter
+
 class CameraCapture:
     """Handles camera initialization and image capturing."""
     JPEG_QUALITY = 80
@@ -11,25 +13,22 @@ class CameraCapture:
     MINUTE_SECOND_SCALE = 4
     DAY_HOUR_OFFSET = 4
     MINUTE_SECOND_OFFSET = 2
+    MAX_STAMP_VALUE = 255
+    # The day pixel holds days * DAY_HOUR_SCALE + DAY_HOUR_OFFSET, which limits stamps to 25 days and 23:59:59.
+    MAX_ELAPSED_SECONDS = ((MAX_STAMP_VALUE - DAY_HOUR_OFFSET) // DAY_HOUR_SCALE + 1) * SECONDS_PER_DAY - 1
 
     def __init__(self, config: dict[str, Any], state: Any) -> None:
-        """Initializes camera settings."""
+        """Initializes camera settings and the background frame writer."""
         self.config = config
         self.state = state
         self.cap = self.initialize_camera()
+        self.writer = FrameWriter(self.config, self.JPEG_QUALITY)
 
-    def initialize_camera(self, device_number: int = 0) -> cv2.VideoCapture:
-        """Initializes the camera with the configured settings."""
-        if self.config["on_raspberry"]:
-            cap = cv2.VideoCapture(device_number, cv2.CAP_V4L2)
-        else:
-            cap = cv2.VideoCapture(device_number)
-
-        cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.config["width"])
-        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.config["height"])
-        cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc('M', 'J', 'P', 'G'))
+    def initialize_camera(self) -> CaptureSource:
+        """Opens the configured capture source (the camera unless 'capture_source' says otherwise)."""
+        cap = create_capture_source(self.config, self.state.img_file_prefix)
 
-        if not cap.isOpened():
+        if not cap.is_opened():
             print("Error: Camera failed to initialize.")
         else:
             print("Camera successfully initialized.")
@@ -38,7 +37,7 @@ class CameraCapture:
 
     def capture_image(self, elapsed_time: int) -> bool:
         """Captures an image and saves it with a timestamp."""
-        if not self.cap or not self.cap.isOpened():
+        if not self.cap or not self.cap.is_opened():
             print("Error: Camera not initialized.")
             return False
 
@@ -46,16 +45,22 @@ class CameraCapture:
         if ret:
             img_path = f"{self.state.base_url_record}{self.state.img_index_record}.jpg"
             self.save_image_with_timestamp(frame, img_path, elapsed_time)
-            print(f"Image saved: {img_path}")
+            print(f"Image queued: {img_path}")
             return True
         else:
             print("Error: Failed to capture image.")
             return False
 
     def save_image_with_timestamp(self, frame: Any, img_path: str, elapsed_time: int) -> None:
-        """Saves an image with a time overlay encoded in pixel values."""
-        stats = self._map_time_to_pixel_values(elapsed_time)
-        pixel_range = self.config["pixels_for_timestamp"]
+        """Stamps the time overlay into the frame and queues it for writing."""
+        self.stamp_timestamp(frame, elapsed_time, self.config["pixels_for_timestamp"])
+        # Encoding and writing happen in the background; the file appears shortly after.
+        self.writer.submit(frame, img_path)
+
+    @classmethod
+    def stamp_timestamp(cls, frame: Any, elapsed_time: int, pixel_range: int) -> None:
+        """Overlays the elapsed time as pixel blocks in the top left corner of the frame."""
+        stats = cls._map_time_to_pixel_values(elapsed_time)
 
         # Overlay the time in the pixel grid
         frame[0:pixel_range, 0:pixel_range] = stats[0]
@@ -66,24 +71,23 @@ class CameraCapture:
         frame[3 * pixel_range:4 * pixel_range, 0:pixel_range] = stats[3]
         frame[0:pixel_range, 3 * pixel_range:4 * pixel_range] = stats[3]
 
-        # Save the image with specified quality
-        cv2.imwrite(img_path, frame, [cv2.IMWRITE_JPEG_QUALITY, self.JPEG_QUALITY])
-
-    def _map_time_to_pixel_values(self, elapsed_time: int) -> list[int]:
+    @classmethod
+    def _map_time_to_pixel_values(cls, elapsed_time: int) -> list[int]:
         """Maps elapsed time to pixel intensity values."""
-        days = elapsed_time // self.SECONDS_PER_DAY
-        hours = (elapsed_time % self.SECONDS_PER_DAY) // self.SECONDS_PER_HOUR
-        minutes = (elapsed_time % self.SECONDS_PER_HOUR) // self.SECONDS_PER_MINUTE
-        seconds = elapsed_time % self.SECONDS_PER_MINUTE
+        days = elapsed_time // cls.SECONDS_PER_DAY
+        hours = (elapsed_time % cls.SECONDS_PER_DAY) // cls.SECONDS_PER_HOUR
+        minutes = (elapsed_time % cls.SECONDS_PER_HOUR) // cls.SECONDS_PER_MINUTE
+        seconds = elapsed_time % cls.SECONDS_PER_MINUTE
         return [
-            days * self.DAY_HOUR_SCALE + self.DAY_HOUR_OFFSET,
-            hours * self.DAY_HOUR_SCALE + self.DAY_HOUR_OFFSET,
-            minutes * self.MINUTE_SECOND_SCALE + self.MINUTE_SECOND_OFFSET,
-            seconds * self.MINUTE_SECOND_SCALE + self.MINUTE_SECOND_OFFSET
+            days * cls.DAY_HOUR_SCALE + cls.DAY_HOUR_OFFSET,
+            hours * cls.DAY_HOUR_SCALE + cls.DAY_HOUR_OFFSET,
+            minutes * cls.MINUTE_SECOND_SCALE + cls.MINUTE_SECOND_OFFSET,
+            seconds * cls.MINUTE_SECOND_SCALE + cls.MINUTE_SECOND_OFFSET
         ]
 
     def cleanup(self) -> None:
-        """Releases the camera resource."""
+        """Writes the queued frames and releases the camera resource."""
+        self.writer.cleanup()
         if self.cap:
             self.cap.release()
             print("Camera resources released.")
@@ -0,0 +1,159 @@
+import os
+import re
+import time
+from abc import ABC, abstractmethod
+from typing import Any
+
+import cv2
+import numpy as np
+
+
+class CaptureSource(ABC):
+    """Interface of the frame sources CameraCapture can read from."""
+
+    @abstractmethod
+    def is_opened(self) -> bool:
+        """Returns whether the source can deliver frames."""
+
+    @abstractmethod
+    def read(self) -> tuple[bool, Any]:
+        """Returns (success, BGR frame); the frame may be modified by the caller."""
+
+    def release(self) -> None:
+        pass
+
+
+class OpenCVCaptureSource(CaptureSource):
+    """Reads from a physical camera through cv2.VideoCapture (V4L2 on the Raspberry Pi)."""
+
+    def __init__(self, config: dict[str, Any], device_number: int = 0) -> None:
+        if config["on_raspberry"]:
+            self.cap = cv2.VideoCapture(device_number, cv2.CAP_V4L2)
+        else:
+            self.cap = cv2.VideoCapture(device_number)
+
+        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, config["width"])
+        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, config["height"])
+        self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc('M', 'J', 'P', 'G'))
+
+    def is_opened(self) -> bool:
+        return self.cap.isOpened()
+
+    def read(self) -> tuple[bool, Any]:
+        return self.cap.read()
+
+    def release(self) -> None:
+        self.cap.release()
+
+
+class _RateLimiter:
+    """Paces reads to a fixed rate; a rate of 0 means unlimited."""
+
+    def __init__(self, fps: float) -> None:
+        self.period = 1.0 / fps if fps > 0 else 0.0
+        self.next_time = time.monotonic()
+
+    def wait(self) -> None:
+        if self.period <= 0:
+            return
+        delay = self.next_time - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        self.next_time = max(self.next_time + self.period, time.monotonic())
+
+
+class SyntheticCaptureSource(CaptureSource):
+    """Generates frames of the configured size without a camera, e.g. for load tests.
+
+    Each frame shows a gradient with a bar that moves one step per frame, so
+    consecutive frames differ like a real scene and compress realistically.
+    """
+    BAR_STEPS = 64
+
+    def __init__(self, config: dict[str, Any], fps: float = 0.0) -> None:
+        self.width = config["width"]
+        self.height = config["height"]
+        self.rate_limiter = _RateLimiter(fps)
+        self.frame_count = 0
+
+        gradient = np.linspace(0, 255, self.width, dtype=np.uint8)
+        self.background = np.repeat(np.tile(gradient, (self.height, 1))[:, :, np.newaxis], 3, axis=2)
+        self.bar_width = max(1, self.width // self.BAR_STEPS)
+
+    def is_opened(self) -> bool:
+        return True
+
+    def read(self) -> tuple[bool, Any]:
+        self.rate_limiter.wait()
+        frame = self.background.copy()
+        bar_start = (self.frame_count % self.BAR_STEPS) * self.bar_width
+        frame[:, bar_start:bar_start + self.bar_width] = (0, 0, 255)
+        self.frame_count += 1
+        return True, frame
+
+
+class ReplayCaptureSource(CaptureSource):
+    """Feeds an existing project directory or a video file as if it came from a camera.
+
+    Frames are resized to the configured size and the source loops at its end.
+    """
+
+    def __init__(self, config: dict[str, Any], path: str, img_file_prefix: str, fps: float = 0.0) -> None:
+        self.size = (config["width"], config["height"])
+        self.rate_limiter = _RateLimiter(fps)
+        self.video: cv2.VideoCapture | None = None
+        self.image_paths: list[str] = []
+        self.position = 0
+
+        if os.path.isdir(path):
+            index_re = re.compile(rf"^{re.escape(img_file_prefix)}(\d+)\.jpg$")
+            indexed_paths = []
+            for entry in os.listdir(path):
+                match = index_re.match(entry)
+                if match:
+                    indexed_paths.append((int(match.group(1)), os.path.join(path, entry)))
+            self.image_paths = [img_path for _, img_path in sorted(indexed_paths)]
+        else:
+            self.video = cv2.VideoCapture(path)
+
+    def is_opened(self) -> bool:
+        if self.video is not None:
+            return self.video.isOpened()
+        return bool(self.image_paths)
+
+    def read(self) -> tuple[bool, Any]:
+        self.rate_limiter.wait()
+        if self.video is not None:
+            ret, frame = self.video.read()
+            if not ret:
+                self.video.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                ret, frame = self.video.read()
+        else:
+            frame = cv2.imread(self.image_paths[self.position])
+            self.position = (self.position + 1) % len(self.image_paths)
+            ret = frame is not None
+
+        if not ret:
+            return False, None
+        if (frame.shape[1], frame.shape[0]) != self.size:
+            frame = cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA)
+        return True, frame
+
+    def release(self) -> None:
+        if self.video is not None:
+            self.video.release()
+
+
+def create_capture_source(config: dict[str, Any], img_file_prefix: str) -> CaptureSource:
+    """Creates the capture source selected by the optional 'capture_source' config key."""
+    source_type = config.get("capture_source", "camera")
+    fps = config.get("capture_source_fps", 0)
+    if source_type == "camera":
+        return OpenCVCaptureSource(config)
+    if source_type == "synthetic":
+        return SyntheticCaptureSource(config, fps)
+    if source_type == "replay":
+        if not config.get("capture_source_path"):
+            raise ValueError("Config value 'capture_source_path' is required for the replay capture source")
+        return ReplayCaptureSource(config, config["capture_source_path"], img_file_prefix, fps)
+    raise ValueError(f"Unknown capture source: {source_type}")
@@ -0,0 +1,137 @@
+import cProfile
+import pstats
+import signal
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any
+
+
+class Diagnostics:
+    """On-demand profiling and memory snapshots of the running process, triggered by signals.
+
+    SIGUSR1 profiles the main loop with cProfile for profile_window_seconds and writes
+    the stats. SIGUSR2 takes a tracemalloc snapshot and writes its difference to the
+    previous one; tracemalloc starts on the first SIGUSR2, so that snapshot is the baseline.
+    After memory_snapshot_limit snapshots tracing stops again, and the next SIGUSR2 starts
+    a new baseline. The signal handlers only set flags, which poll() handles on the main
+    loop. Nothing is traced until a signal arrives or after a series of snapshots ends.
+    Reports are written to output_dir, the program folder that also holds state.journal.
+
+        kill -USR1 <pid>    # profile the next 30 seconds
+        kill -USR2 <pid>    # memory snapshot (send twice or more to see growth)
+    """
+    DEFAULT_PROFILE_WINDOW_SECONDS = 30
+    DEFAULT_MEMORY_SNAPSHOT_LIMIT = 5
+    PROFILE_REPORT_LINES = 40
+    MEMORY_REPORT_LINES = 30
+    TRACEMALLOC_FRAMES = 5
+
+    def __init__(self, config: dict[str, Any], state: Any, output_dir: Path) -> None:
+        """Installs the signal handlers where the platform supports them."""
+        self.config = config
+        self.state = state
+        self.output_dir = output_dir
+        self.profile_window_seconds = self.config.get("profile_window_seconds", self.DEFAULT_PROFILE_WINDOW_SECONDS)
+        self.memory_snapshot_limit = max(
+            2, self.config.get("memory_snapshot_limit", self.DEFAULT_MEMORY_SNAPSHOT_LIMIT)
+        )  # The first snapshot of a series is only the baseline.
+
+        self._profile_requested = False
+        self._snapshot_requested = False
+        self._profiler: cProfile.Profile | None = None
+        self._profile_end_time = 0.0
+        self._previous_snapshot: tracemalloc.Snapshot | None = None
+        self._snapshot_count = 0
+
+        # SIGUSR1/SIGUSR2 do not exist on Windows.
+        if hasattr(signal, "SIGUSR1"):
+            signal.signal(signal.SIGUSR1, self._request_profile)
+            signal.signal(signal.SIGUSR2, self._request_snapshot)
+
+    def _request_profile(self, signum: int, frame: Any) -> None:
+        self._profile_requested = True
+
+    def _request_snapshot(self, signum: int, frame: Any) -> None:
+        self._snapshot_requested = True
+
+    def _output_path(self, kind: str, extension: str) -> Path:
+        return self.output_dir / f"{kind}_{time.strftime('%Y%m%d-%H%M%S')}{extension}"
+
+    def poll(self) -> None:
+        """Starts, finishes or takes requested diagnostics; call once per main loop tick."""
+        if self._profile_requested:
+            self._profile_requested = False
+            self.start_profile()
+        if self._profiler is not None and time.monotonic() >= self._profile_end_time:
+            self.finish_profile()
+        if self._snapshot_requested:
+            self._snapshot_requested = False
+            self.take_memory_snapshot()
+
+    def start_profile(self) -> None:
+        if self._profiler is not None:
+            return
+        print(f"Profiling for {self.profile_window_seconds} s")
+        self._profile_end_time = time.monotonic() + self.profile_window_seconds
+        self._profiler = cProfile.Profile()
+        self._profiler.enable()
+
+    def finish_profile(self) -> None:
+        if self._profiler is None:
+            return
+        self._profiler.disable()
+        profiler, self._profiler = self._profiler, None
+
+        stats_path = self._output_path("profile", ".prof")
+        profiler.dump_stats(str(stats_path))
+        report_path = stats_path.with_suffix(".txt")
+        with open(report_path, "w", encoding="utf-8") as report_file:
+            stats = pstats.Stats(profiler, stream=report_file)
+            stats.sort_stats("cumulative").print_stats(self.PROFILE_REPORT_LINES)
+        print(f"Profile written: {stats_path} ({report_path.name})")
+
+    def take_memory_snapshot(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.TRACEMALLOC_FRAMES)
+            print("Memory tracing started; the next snapshot shows growth from now on.")
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, tracemalloc.__file__)]
+        )
+
+        report_path = self._output_path("memory", ".txt")
+        current_bytes, peak_bytes = tracemalloc.get_traced_memory()
+        with open(report_path, "w", encoding="utf-8") as report_file:
+            report_file.write(f"Traced memory: {current_bytes / 1e6:.1f} MB (peak {peak_bytes / 1e6:.1f} MB)\n")
+            report_file.write(
+                f"Recording: {self.state.project_name_record} ({len(self.state.img_indices_record)} frames), "
+                f"display: {self.state.project_name_display} ({len(self.state.img_indices_display)} frames)\n\n"
+            )
+            if self._previous_snapshot is not None:
+                report_file.write("Growth since previous snapshot:\n")
+                for stat in snapshot.compare_to(self._previous_snapshot, "lineno")[: self.MEMORY_REPORT_LINES]:
+                    report_file.write(f"{stat}\n")
+                report_file.write("\n")
+            report_file.write("Largest allocations:\n")
+            for stat in snapshot.statistics("lineno")[: self.MEMORY_REPORT_LINES]:
+                report_file.write(f"{stat}\n")
+
+        self._previous_snapshot = snapshot
+        self._snapshot_count += 1
+        print(f"Memory snapshot written: {report_path}")
+
+        if self._snapshot_count >= self.memory_snapshot_limit:
+            print(f"Memory tracing stopped after {self._snapshot_count} snapshots.")
+            self.stop_memory_tracing()
+
+    def stop_memory_tracing(self) -> None:
+        """Stops tracemalloc; the next snapshot starts a new series with a fresh baseline."""
+        tracemalloc.stop()
+        self._previous_snapshot = None
+        self._snapshot_count = 0
+
+    def cleanup(self) -> None:
+        """Writes a profile that is still running and stops memory tracing."""
+        self.finish_profile()
+        if tracemalloc.is_tracing():
+            self.stop_memory_tracing()
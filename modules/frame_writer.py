@@ -0,0 +1,111 @@
+import os
+import queue
+import threading
+import time
+from typing import Any
+
+import cv2
+
+
+class FrameWriter:
+    """Encodes and writes captured frames in background threads.
+
+    Capturing only stamps the frame and queues it, so the next capture never waits
+    for JPEG encoding or the SD card. Several encoder threads run in parallel
+    (cv2.imencode releases the GIL). The queue is bounded: when writing falls behind,
+    submit() blocks instead of dropping frames. Each file is written under a
+    temporary name and renamed, so readers never see a half-written frame. A frame that
+    fails to encode or write is counted and skipped; the encoder threads keep running, as
+    submit() would block forever once all of them were gone.
+    """
+    DEFAULT_QUEUE_FRAMES = 8
+    DEFAULT_ENCODE_THREADS = 2
+    JOIN_TIMEOUT_SECONDS = 10.0
+    JPG_EXTENSION = ".jpg"
+    TMP_SUFFIX = ".tmp"
+    OPEN_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+
+    def __init__(self, config: dict[str, Any], jpeg_quality: int) -> None:
+        """Starts the encoder threads."""
+        self.encode_params = [cv2.IMWRITE_JPEG_QUALITY, jpeg_quality]
+        self.failed_frames = 0
+        self.written_bytes = 0
+
+        self._lock = threading.Lock()
+        self._frames: queue.Queue[tuple[Any, str] | None] = queue.Queue(
+            maxsize=config.get("capture_queue_frames", self.DEFAULT_QUEUE_FRAMES)
+        )
+        self._threads = [
+            threading.Thread(target=self._run, name=f"frame-writer-{number}", daemon=True)
+            for number in range(max(1, config.get("capture_encode_threads", self.DEFAULT_ENCODE_THREADS)))
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, frame: Any, img_path: str) -> None:
+        """Queues a frame for encoding; the writer takes ownership of the frame buffer."""
+        self._frames.put((frame, img_path))
+
+    def flush(self) -> None:
+        """Waits until every queued frame has been written."""
+        self._frames.join()
+
+    def _run(self) -> None:
+        while True:
+            item = self._frames.get()
+            try:
+                if item is None:
+                    return
+                self._write(*item)
+            except Exception as exc:
+                self._record_failure(item[1], f"unexpected error: {exc}")
+            finally:
+                self._frames.task_done()
+
+    def _write(self, frame: Any, img_path: str) -> None:
+        try:
+            ok, encoded = cv2.imencode(self.JPG_EXTENSION, frame, self.encode_params)
+        except cv2.error as exc:
+            self._record_failure(img_path, f"encoding failed: {exc}")
+            return
+        if not ok:
+            self._record_failure(img_path, "encoding failed")
+            return
+
+        tmp_path = f"{img_path}{self.TMP_SUFFIX}"
+        try:
+            fd = os.open(tmp_path, self.OPEN_FLAGS, 0o644)
+            try:
+                # The encoded buffer is written directly, without a copy into a bytes object.
+                view = memoryview(encoded).cast("B")
+                while view:
+                    view = view[os.write(fd, view):]
+            finally:
+                os.close(fd)
+            os.replace(tmp_path, img_path)
+        except OSError as exc:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            self._record_failure(img_path, str(exc))
+            return
+
+        with self._lock:
+            self.written_bytes += encoded.size
+
+    def _record_failure(self, img_path: str, reason: str) -> None:
+        with self._lock:
+            self.failed_frames += 1
+        print(f"Error: Failed to write image {img_path}: {reason}")
+
+    def cleanup(self) -> None:
+        """Writes the queued frames and stops the encoder threads, waiting at most JOIN_TIMEOUT_SECONDS."""
+        deadline = time.monotonic() + self.JOIN_TIMEOUT_SECONDS
+        try:
+            for _ in self._threads:
+                self._frames.put(None, timeout=max(0.0, deadline - time.monotonic()))
+        except queue.Full:
+            pass  # Reported below.
+        for thread in self._threads:
+            thread.join(timeout=max(0.0, deadline - time.monotonic()))
+        if any(thread.is_alive() for thread in self._threads):
+            print("Error: Frame writer did not finish in time; queued frames may be lost.")
@@ -22,6 +22,8 @@ class ProgramState:
     base_url_display: str = ""
     img_index_display: int = -1
     img_indices_display: list[int] = field(default_factory=list)
+    project_positions: dict[str, int] = field(default_factory=dict)
+    hold_display_frame: bool = False  # Show img_index_display once without stepping, e.g. after a switch.
 
     # Time and playback state
     program_start_time: float = field(default_factory=time.time)
@@ -0,0 +1,61 @@
+import json
+import os
+import threading
+from typing import Any
+
+
+class ProjectCatalog:
+    """Reads and writes the per-project metadata file (catalog.json)."""
+    CATALOG_FILENAME = "catalog.json"
+    FRAME_DELTA_KEY = "frame_delta_seconds"
+    FRAME_DELTA_FRAMES_KEY = "frame_delta_frames"  # [frame count, last frame index] the delta was measured on.
+
+    def __init__(self, projects_folder: str) -> None:
+        """Initializes the catalog store for the given projects folder."""
+        self.projects_folder = projects_folder
+        # Background workers update catalogs too; serialize read-modify-write cycles.
+        self._lock = threading.Lock()
+
+    def catalog_path(self, project_name: str) -> str:
+        return os.path.join(self.projects_folder, project_name, self.CATALOG_FILENAME)
+
+    def load(self, project_name: str) -> dict[str, Any]:
+        """Returns the stored catalog of a project, or an empty dict if missing or invalid."""
+        try:
+            with open(self.catalog_path(project_name), "r", encoding="utf-8") as catalog_file:
+                catalog = json.load(catalog_file)
+        except (FileNotFoundError, ValueError):
+            return {}
+        return catalog if isinstance(catalog, dict) else {}
+
+    def save(self, project_name: str, catalog: dict[str, Any]) -> None:
+        """Writes the catalog atomically so a crash never leaves a half-written file."""
+        path = self.catalog_path(project_name)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as catalog_file:
+            json.dump(catalog, catalog_file)
+        os.replace(tmp_path, path)
+
+    def update(self, project_name: str, **values: Any) -> None:
+        """Merges the given values into the stored catalog of a project."""
+        with self._lock:
+            catalog = self.load(project_name)
+            catalog.update(values)
+            self.save(project_name, catalog)
+
+    @classmethod
+    def frame_delta_values(cls, delta_seconds: float, indices: list[int]) -> dict[str, Any]:
+        """Returns the catalog values storing a frame delta together with the frames it was measured on."""
+        return {cls.FRAME_DELTA_KEY: delta_seconds, cls.FRAME_DELTA_FRAMES_KEY: [len(indices), indices[-1]]}
+
+    def load_frame_delta_seconds(self, project_name: str, indices: list[int]) -> float | None:
+        """Returns the cataloged frame delta, or None if missing or the frames changed since it was measured.
+
+        Frames can be removed or renumbered while the program is not running (e.g. by
+        reduce_project_frames.py), which changes the frame delta without touching the catalog.
+        """
+        catalog = self.load(project_name)
+        delta_seconds = catalog.get(self.FRAME_DELTA_KEY)
+        if delta_seconds is None or not indices or catalog.get(self.FRAME_DELTA_FRAMES_KEY) != [len(indices), indices[-1]]:
+            return None
+        return float(delta_seconds)
@@ -1,8 +1,11 @@
+import bisect
 import os
 import time
 from typing import Any
 import cv2
 
+from modules.project_catalog import ProjectCatalog
+
 
 class ProjectManager:
     """Manages project directories and state initialization."""
@@ -14,6 +17,9 @@ class ProjectManager:
     SECONDS_PER_DAY = 86400
     SECONDS_PER_HOUR = 3600
     SECONDS_PER_MINUTE = 60
+    TIMESTAMP_SQUARES = 4
+    # Reduced JPEG decodes, largest reduction first; 1/8 decodes little more than the block averages.
+    REDUCED_DECODES = ((8, cv2.IMREAD_REDUCED_COLOR_8), (4, cv2.IMREAD_REDUCED_COLOR_4), (2, cv2.IMREAD_REDUCED_COLOR_2))
 
     def __init__(self, config: dict[str, Any], state: Any) -> None:
         """Initializes the ProjectManager with configuration and state."""
@@ -21,6 +27,8 @@ class ProjectManager:
         self.state = state
         self.default_project_name = self.config.get("default_project_name", self.DEFAULT_PROJECT_NAME)
         self.ensure_directory_exists(self.config["projects_folder"])
+        self.catalog = ProjectCatalog(self.config["projects_folder"])
+        self.timestamp_scale, self.timestamp_read_flag = self.timestamp_decode(self.config["pixels_for_timestamp"])
 
     def ensure_directory_exists(self, path: str) -> None:
         os.makedirs(path, exist_ok=True)
@@ -28,29 +36,50 @@ class ProjectManager:
     def project_image_base_path(self, project_name: str) -> str:
         return os.path.join(self.config["projects_folder"], project_name, self.state.img_file_prefix)
 
-    def _extract_elapsed_seconds_from_image(self, image_path: str) -> int | None:
-        frame = cv2.imread(image_path)
+    def extract_elapsed_seconds_from_image(self, image_path: str) -> int | None:
+        # Only the timestamp squares are needed, so a reduced decode is enough.
+        frame = cv2.imread(image_path, self.timestamp_read_flag)
         if frame is None:
             return None
-
-        pixel = self.config["pixels_for_timestamp"]
-        if frame.shape[0] < 4 * pixel or frame.shape[1] < pixel:
+        return self.elapsed_seconds_from_frame(frame, self.config["pixels_for_timestamp"], self.timestamp_scale)
+
+    @classmethod
+    def timestamp_decode(cls, pixel: int) -> tuple[int, int]:
+        """Returns the scale and imread flag of the smallest decode that still reads the timestamp squares.
+
+        A reduced decode averages blocks of scale x scale pixels; it is usable when the
+        block holding the center of every square lies entirely inside that square.
+        """
+        for scale, flag in cls.REDUCED_DECODES:
+            block_starts = [(square * pixel + pixel // 2) // scale * scale for square in range(cls.TIMESTAMP_SQUARES)]
+            if all(
+                square * pixel <= start and start + scale <= (square + 1) * pixel
+                for square, start in enumerate(block_starts)
+            ):
+                return scale, flag
+        return 1, cv2.IMREAD_COLOR
+
+    @classmethod
+    def elapsed_seconds_from_frame(cls, frame: Any, pixel: int, scale: int = 1) -> int | None:
+        """Reads the elapsed time from the timestamp pixels of a decoded frame, reduced by scale."""
+        if frame.shape[0] * scale < cls.TIMESTAMP_SQUARES * pixel or frame.shape[1] * scale < pixel:
             return None
 
-        value_days = int(frame[pixel // 2, pixel // 2].mean())
-        value_hours = int(frame[pixel + pixel // 2, pixel // 2].mean())
-        value_minutes = int(frame[2 * pixel + pixel // 2, pixel // 2].mean())
-        value_seconds = int(frame[3 * pixel + pixel // 2, pixel // 2].mean())
+        column = pixel // 2 // scale
+        value_days = int(frame[pixel // 2 // scale, column].mean())
+        value_hours = int(frame[(pixel + pixel // 2) // scale, column].mean())
+        value_minutes = int(frame[(2 * pixel + pixel // 2) // scale, column].mean())
+        value_seconds = int(frame[(3 * pixel + pixel // 2) // scale, column].mean())
 
-        days = value_days // self.TIMESTAMP_DIVISOR_DAY_HOUR
-        hours = value_hours // self.TIMESTAMP_DIVISOR_DAY_HOUR
-        minutes = value_minutes // self.TIMESTAMP_DIVISOR_MINUTE_SECOND
-        seconds = value_seconds // self.TIMESTAMP_DIVISOR_MINUTE_SECOND
+        days = value_days // cls.TIMESTAMP_DIVISOR_DAY_HOUR
+        hours = value_hours // cls.TIMESTAMP_DIVISOR_DAY_HOUR
+        minutes = value_minutes // cls.TIMESTAMP_DIVISOR_MINUTE_SECOND
+        seconds = value_seconds // cls.TIMESTAMP_DIVISOR_MINUTE_SECOND
 
         return (
-            days * self.SECONDS_PER_DAY
-            + hours * self.SECONDS_PER_HOUR
-            + minutes * self.SECONDS_PER_MINUTE
+            days * cls.SECONDS_PER_DAY
+            + hours * cls.SECONDS_PER_HOUR
+            + minutes * cls.SECONDS_PER_MINUTE
             + seconds
         )
 
@@ -63,12 +92,12 @@ class ProjectManager:
         base_path = self.project_image_base_path(project)
 
         for i in range(len(sample_indices) - 1):
-            first_time = self._extract_elapsed_seconds_from_image(f"{base_path}{sample_indices[i]}{self.JPG_EXTENSION}")
+            first_time = self.extract_elapsed_seconds_from_image(f"{base_path}{sample_indices[i]}{self.JPG_EXTENSION}")
             if first_time is None:
                 continue
 
             for j in range(i + 1, len(sample_indices)):
-                second_time = self._extract_elapsed_seconds_from_image(f"{base_path}{sample_indices[j]}{self.JPG_EXTENSION}")
+                second_time = self.extract_elapsed_seconds_from_image(f"{base_path}{sample_indices[j]}{self.JPG_EXTENSION}")
                 if second_time is None:
                     continue
 
@@ -79,6 +108,22 @@ class ProjectManager:
 
         return default_delta
 
+    def resolve_frame_delta_seconds(self, project: str) -> float:
+        """Returns the frame delta of a project, inferring and cataloging it on first use."""
+        project_info = self.state.projects_dict[project]
+        delta_seconds = project_info["frame_delta_seconds"]
+        if delta_seconds is not None:
+            return delta_seconds
+
+        indices = project_info["indices"]
+        delta_seconds = self._infer_project_frame_delta_seconds(project, indices)
+        project_info["frame_delta_seconds"] = delta_seconds
+
+        # Only persist deltas measured from frames; empty projects keep using the interval.
+        if len(indices) >= 2:
+            self.catalog.update(project, **self.catalog.frame_delta_values(delta_seconds, indices))
+        return delta_seconds
+
     def setup(self) -> None:
         self.get_projects()
 
@@ -87,6 +132,24 @@ class ProjectManager:
   
         self.setup_display_project()
 
+    def frame_index_from_filename(self, filename: str) -> int | None:
+        """Returns the frame index of an image file name, or None for other files."""
+        if not filename.startswith(self.state.img_file_prefix) or not filename.endswith(self.JPG_EXTENSION):
+            return None
+        number = filename[len(self.state.img_file_prefix):-len(self.JPG_EXTENSION)]
+        return int(number) if number.isdigit() else None
+
+    def scan_project_indices(self, project: str) -> list[int]:
+        """Returns the sorted frame indices found in a project directory."""
+        indices = []
+        with os.scandir(os.path.join(self.config["projects_folder"], project)) as entries:
+            for entry in entries:
+                index = self.frame_index_from_filename(entry.name)
+                if index is not None and entry.is_file():
+                    indices.append(index)
+        indices.sort()  # Ensure indices are sorted
+        return indices
+
 ###################################################################################################
     def get_projects(self) -> None:
         """Retrieves projects and sorts them by creation time."""
@@ -106,30 +169,107 @@ class ProjectManager:
 
         # Count files in each project directory
         for project in projects_list:
-            dir_path = os.path.join(self.config["projects_folder"], project)
-
-            file_entries = [
-                entry for entry in os.listdir(dir_path)
-                if os.path.isfile(os.path.join(dir_path, entry)) and entry.startswith(self.state.img_file_prefix)
-            ]
-
-            # Extract numeric indices from file names
-            indices = []
-            for entry in file_entries:
-                number = entry.replace(self.state.img_file_prefix, "").replace(self.JPG_EXTENSION, "")
-                if number.isdigit():
-                    indices.append(int(number))
-
-            indices.sort()  # Ensure indices are sorted
-
-            self.state.projects_dict[project] = {
-                "indices": indices,
-                "frame_delta_seconds": self._infer_project_frame_delta_seconds(project, indices),
-            }
+            self.state.projects_dict[project] = self._load_project_info(project)
 
         self.state.projects = projects_list
         print("self.state.projects:", projects_list)
 
+    def add_project(self, project: str) -> None:
+        """Registers a project directory that appeared while the program is running."""
+        if project in self.state.projects_dict:
+            return
+        self.state.projects_dict[project] = self._load_project_info(project)
+        self.state.projects.append(project)
+        self._sort_projects()
+        print(f"Project added: {project}")
+
+    def _load_project_info(self, project: str) -> dict[str, Any]:
+        # The frame delta is read from the catalog; missing or outdated ones are inferred lazily.
+        indices = self.scan_project_indices(project)
+        return {
+            "indices": indices,
+            "frame_delta_seconds": self.catalog.load_frame_delta_seconds(project, indices),
+        }
+
+    def remove_project(self, project: str) -> None:
+        """Forgets a project directory that was deleted while the program is running."""
+        if project not in self.state.projects_dict or project == self.state.project_name_record:
+            return
+        del self.state.projects_dict[project]
+        self.state.projects.remove(project)
+        print(f"Project removed: {project}")
+
+        if project == self.state.project_name_display:
+            self.setup_display_project()
+        else:
+            self._sort_projects()
+
+    def update_project_frames(self, project: str, changes: dict[int, bool]) -> tuple[list[int], list[int]]:
+        """Applies frame additions (True) and removals (False) to a project's sorted indices.
+
+        The indices list is updated in place because the display and recording state share it.
+        Returns the indices that were actually added and removed.
+        """
+        indices = self.state.projects_dict[project]["indices"]
+        added, removed = [], []
+        for index, exists in sorted(changes.items()):
+            position = bisect.bisect_left(indices, index)
+            is_present = position < len(indices) and indices[position] == index
+            if exists and not is_present:
+                indices.insert(position, index)
+                added.append(index)
+            elif not exists and is_present:
+                del indices[position]
+                removed.append(index)
+
+        # A project that just got its first frames has no measured delta yet; removals may change it.
+        if removed or (added and len(indices) - len(added) < 2 <= len(indices)):
+            self.state.projects_dict[project]["frame_delta_seconds"] = None
+            if project == self.state.project_name_display:
+                self.state.display_frame_delta_seconds = self.resolve_frame_delta_seconds(project)
+        return added, removed
+
+    def record_captured_frame(self) -> int:
+        """Registers the frame just saved at img_index_record and advances the index.
+
+        Returns the index of the registered frame.
+        """
+        captured_index = self.state.img_index_record
+        self._insert_index(self.state.img_indices_record, captured_index)
+
+        if self.state.project_name_display == self.state.project_name_record:
+            if self.state.img_indices_display is not self.state.img_indices_record:
+                self._insert_index(self.state.img_indices_display, captured_index)
+
+        self.state.img_index_record += 1
+        return captured_index
+
+    def _insert_index(self, indices: list[int], index: int) -> None:
+        # Captures almost always append, so avoid the search in that case.
+        if not indices or indices[-1] < index:
+            indices.append(index)
+            return
+        position = bisect.bisect_left(indices, index)
+        if position == len(indices) or indices[position] != index:
+            indices.insert(position, index)
+
+    def _next_record_index(self) -> int:
+        # The saved index may lag behind the files written before a power cut; never reuse an index on disk.
+        indices = self.state.img_indices_record
+        return max(self.state.img_index_record, indices[-1] + 1 if indices else 0)
+
+    def _project_ctime(self, project: str) -> float:
+        try:
+            return os.path.getctime(os.path.join(self.config["projects_folder"], project))
+        except OSError:
+            return 0.0  # Deleted meanwhile; its removal is applied separately.
+
+    def _sort_projects(self) -> None:
+        # Sort by creation time (newest first), keeping the display index pointing at the same project.
+        self.state.projects.sort(key=lambda d: -self._project_ctime(d))
+        if self.state.project_name_display in self.state.projects:
+            self.state.project_name_display_index = self.state.projects.index(self.state.project_name_display)
+
 ###################################################################################################
     def setup_recording_project(self) -> None:
 
@@ -148,7 +288,7 @@ class ProjectManager:
         # If no empty project directories, use default or existing recording project
         if self.state.project_name_record in self.state.projects:
             self.state.img_indices_record = self.state.projects_dict[self.state.project_name_record]["indices"]
-            self.state.img_index_record = max(self.state.img_index_record, len(self.state.img_indices_record))
+            self.state.img_index_record = self._next_record_index()
 
             # Define recording and display URLs for image storage
             self.state.base_url_record = self.project_image_base_path(self.state.project_name_record)
@@ -164,7 +304,7 @@ class ProjectManager:
             }
 
         self.state.img_indices_record = self.state.projects_dict[self.state.project_name_record]["indices"]
-        self.state.img_index_record = max(self.state.img_index_record, len(self.state.img_indices_record))
+        self.state.img_index_record = self._next_record_index()
 
         self.state.base_url_record = self.project_image_base_path(self.state.project_name_record)
         print(f"Recording Project: {self.state.project_name_record} | Current Image Index: {self.state.img_index_record}")
@@ -173,13 +313,17 @@ class ProjectManager:
 ###################################################################################################
     def setup_display_project(self) -> None:
 
+        # Resolve the default display up front so returning to it never blocks on inference.
+        if self.config.get("default_display") in self.state.projects:
+            self.resolve_frame_delta_seconds(self.config["default_display"])
+
         if self.config["capture"]:
             self.state.project_name_display = self.state.project_name_record
             self.state.project_name_display_index = self.state.projects.index(self.state.project_name_record)
             self.state.base_url_display = self.state.base_url_record
             self.state.img_indices_display = self.state.img_indices_record
             self.state.img_index_display = -1
-            self.state.display_frame_delta_seconds = self.state.projects_dict[self.state.project_name_display]["frame_delta_seconds"]
+            self.state.display_frame_delta_seconds = self.resolve_frame_delta_seconds(self.state.project_name_display)
             self.state.frame_advance_accumulator = 0.0
         elif self.config.get("default_display") in self.state.projects:
             self.state.project_name_display = self.config["default_display"]
@@ -187,7 +331,7 @@ class ProjectManager:
             self.state.base_url_display = self.project_image_base_path(self.state.project_name_display)
             self.state.img_indices_display = self.state.projects_dict[self.state.project_name_display]["indices"]
             self.state.img_index_display = -1
-            self.state.display_frame_delta_seconds = self.state.projects_dict[self.state.project_name_display]["frame_delta_seconds"]
+            self.state.display_frame_delta_seconds = self.resolve_frame_delta_seconds(self.state.project_name_display)
             self.state.frame_advance_accumulator = 0.0
         else:
             self.state.project_name_display_index = 0
@@ -195,7 +339,7 @@ class ProjectManager:
             self.state.base_url_display = self.project_image_base_path(self.state.project_name_display)
             self.state.img_indices_display = self.state.projects_dict[self.state.project_name_display]["indices"]
             self.state.img_index_display = -1
-            self.state.display_frame_delta_seconds = self.state.projects_dict[self.state.project_name_display]["frame_delta_seconds"]
+            self.state.display_frame_delta_seconds = self.resolve_frame_delta_seconds(self.state.project_name_display)
             self.state.frame_advance_accumulator = 0.0
 
         print("base url display", self.state.base_url_display)
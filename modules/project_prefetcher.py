@@ -0,0 +1,84 @@
+import threading
+from typing import Any
+
+import cv2
+
+from modules.project_worker import ProjectWorker
+
+
+class ProjectPrefetcher(ProjectWorker):
+    """Keeps the resume frames and metadata of neighbouring projects decoded in the background."""
+    THREAD_NAME = "project-prefetcher"
+    TASK = "prefetch"
+
+    def __init__(self, config: dict[str, Any], state: Any, project_manager: Any) -> None:
+        """Starts the background worker that warms neighbouring projects."""
+        super().__init__(config, state, project_manager)
+
+        # Per neighbouring project: the path of its resume frame and the decoded frame.
+        self._frames: dict[str, tuple[str, Any]] = {}
+        self._neighbours: list[str] = []
+        self._frames_lock = threading.Lock()
+
+    def resume_position(self, project: str) -> int:
+        """Returns the remembered playback position of a project, clamped to its frames."""
+        indices = self.state.projects_dict[project]["indices"]
+        if not indices:
+            return -1
+        position = self.state.project_positions.get(project, 0)
+        return max(0, min(position, len(indices) - 1))
+
+    def prewarm_neighbours(self) -> None:
+        """Queues the projects before and after the displayed one for warming."""
+        projects = self.state.projects
+        if len(projects) < 2:
+            return
+
+        current_index = self.state.project_name_display_index
+        neighbours = list(dict.fromkeys([
+            projects[(current_index - 1) % len(projects)],
+            projects[(current_index + 1) % len(projects)],
+        ]))
+        with self._frames_lock:
+            self._neighbours = neighbours
+            # Drop frames of projects that are no longer adjacent.
+            self._frames = {project: entry for project, entry in self._frames.items() if project in neighbours}
+        for project in neighbours:
+            self.request_update(project)
+
+    def take_frame(self, img_path: str) -> Any | None:
+        """Hands over a prefetched frame for the given path, if one is ready."""
+        with self._frames_lock:
+            for project, (path, frame) in self._frames.items():
+                if path == img_path:
+                    del self._frames[project]
+                    return frame
+        return None
+
+    def _resume_frame_path(self, project: str) -> str | None:
+        position = self.resume_position(project)
+        if position < 0:
+            return None
+        img_index = self.state.projects_dict[project]["indices"][position]
+        return f"{self.project_manager.project_image_base_path(project)}{img_index}{self.JPG_EXTENSION}"
+
+    def _process(self, project: str) -> None:
+        # Only the latest neighbours matter when keys are pressed faster than frames decode.
+        if project not in self._neighbours:
+            return
+
+        self.project_manager.resolve_frame_delta_seconds(project)
+        img_path = self._resume_frame_path(project)
+        if img_path is None:
+            return
+        with self._frames_lock:
+            entry = self._frames.get(project)
+            if entry is not None and entry[0] == img_path:
+                return
+
+        frame = cv2.imread(img_path)
+        if frame is None:
+            return
+        with self._frames_lock:
+            if project in self._neighbours:
+                self._frames[project] = (img_path, frame)
@@ -0,0 +1,241 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from typing import Any
+
+
+class ProjectWatcher:
+    """Discovers projects and frames that appear or disappear while the program runs.
+
+    Uses inotify on Linux and falls back to polling the projects folder elsewhere.
+    Changes are collected by a background thread and applied on the main thread by
+    apply_pending() once the folder has been quiet for DEBOUNCE_SECONDS, so a bulk
+    copy results in a single update. Listeners (the timestamp index and other per-project
+    caches) are told about changed frames with frames_changed(project, removed) and about
+    deleted projects with project_removed(project).
+    """
+    DEBOUNCE_SECONDS = 1.0
+    MAX_DELAY_SECONDS = 10.0
+    POLL_INTERVAL_SECONDS = 10.0
+    SELECT_TIMEOUT_SECONDS = 0.5
+    JOIN_TIMEOUT_SECONDS = 1.0
+    READ_BUFFER_SIZE = 64 * 1024
+
+    # inotify flags from <sys/inotify.h>
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ONLYDIR = 0x01000000
+    IN_ISDIR = 0x40000000
+    FOLDER_MASK = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_ONLYDIR
+    PROJECT_MASK = IN_CLOSE_WRITE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_ONLYDIR
+    EVENT_HEADER = struct.Struct("iIII")
+
+    def __init__(self, config: dict[str, Any], state: Any, project_manager: Any, listeners: list[Any]) -> None:
+        """Starts watching the projects folder in a background thread."""
+        self.config = config
+        self.state = state
+        self.project_manager = project_manager
+        self.listeners = listeners
+        self.projects_folder = self.config["projects_folder"]
+
+        self._lock = threading.Lock()
+        self._pending_projects: dict[str, bool] = {}
+        self._pending_frames: dict[str, dict[int, bool]] = {}
+        self._first_event_time: float | None = None
+        self._last_event_time = 0.0
+        self._stop_event = threading.Event()
+
+        self._libc = self._load_inotify()
+        target = self._run_inotify if self._libc is not None else self._run_polling
+        self._thread = threading.Thread(target=target, name="project-watcher", daemon=True)
+        self._thread.start()
+
+    def apply_pending(self) -> None:
+        """Applies the collected changes to the program state once they have settled."""
+        with self._lock:
+            if self._first_event_time is None:
+                return
+            now = time.monotonic()
+            if now - self._last_event_time < self.DEBOUNCE_SECONDS and now - self._first_event_time < self.MAX_DELAY_SECONDS:
+                return
+            pending_projects, self._pending_projects = self._pending_projects, {}
+            pending_frames, self._pending_frames = self._pending_frames, {}
+            self._first_event_time = None
+
+        for project, exists in pending_projects.items():
+            if exists:
+                try:
+                    self.project_manager.add_project(project)
+                except OSError:
+                    continue  # Removed again before the change was applied.
+            else:
+                self.project_manager.remove_project(project)
+                if project not in self.state.projects_dict:
+                    for listener in self.listeners:
+                        listener.project_removed(project)
+
+        for project, changes in pending_frames.items():
+            if project not in self.state.projects_dict:
+                continue
+            added, removed = self.project_manager.update_project_frames(project, changes)
+            if added or removed:
+                for listener in self.listeners:
+                    listener.frames_changed(project, removed)
+                print(f"Project {project}: {len(added)} frames added, {len(removed)} frames removed")
+
+    def _project_changed(self, project: str, exists: bool) -> None:
+        with self._lock:
+            if self._pending_projects.get(project) == exists:
+                return
+            self._pending_projects[project] = exists
+            if not exists:
+                self._pending_frames.pop(project, None)
+            self._touch()
+
+    def _frame_changed(self, project: str, index: int, exists: bool) -> None:
+        with self._lock:
+            changes = self._pending_frames.setdefault(project, {})
+            if changes.get(index) == exists:
+                return
+            changes[index] = exists
+            self._touch()
+
+    def _touch(self) -> None:
+        now = time.monotonic()
+        if self._first_event_time is None:
+            self._first_event_time = now
+        self._last_event_time = now
+
+    def _rescan(self) -> None:
+        """Compares the projects folder with the program state and queues the differences."""
+        on_disk: dict[str, set[int]] = {}
+        with os.scandir(self.projects_folder) as entries:
+            for entry in entries:
+                if not entry.is_dir():
+                    continue
+                try:
+                    on_disk[entry.name] = set(self.project_manager.scan_project_indices(entry.name))
+                except OSError:
+                    continue  # Removed while scanning.
+
+        known_projects = list(self.state.projects_dict)
+        for project in on_disk.keys() - set(known_projects):
+            self._project_changed(project, True)
+        for project in set(known_projects) - on_disk.keys():
+            self._project_changed(project, False)
+
+        for project in on_disk.keys() & set(known_projects):
+            project_info = self.state.projects_dict.get(project)
+            if project_info is None:
+                continue
+            known_indices = set(project_info["indices"])
+            for index in on_disk[project] - known_indices:
+                self._frame_changed(project, index, True)
+            for index in known_indices - on_disk[project]:
+                self._frame_changed(project, index, False)
+
+    def _run_polling(self) -> None:
+        while not self._stop_event.wait(self.POLL_INTERVAL_SECONDS):
+            try:
+                self._rescan()
+            except OSError as exc:
+                print(f"Error: Failed to scan projects folder: {exc}")
+
+    def _load_inotify(self) -> Any:
+        if not sys.platform.startswith("linux"):
+            return None
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            libc.inotify_init1  # Raises AttributeError on systems without inotify.
+        except (OSError, AttributeError):
+            return None
+        return libc
+
+    def _add_watch(self, fd: int, path: str, mask: int) -> int:
+        wd = self._libc.inotify_add_watch(fd, os.fsencode(path), mask)
+        if wd < 0:
+            print(f"Error: Failed to watch {path}: {os.strerror(ctypes.get_errno())}")
+        return wd
+
+    def _watch_projects(self, fd: int, watches: dict[int, str | None]) -> None:
+        """Adds a watch for every project directory; existing watches are kept as they are."""
+        with os.scandir(self.projects_folder) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    watches[self._add_watch(fd, entry.path, self.PROJECT_MASK)] = entry.name
+
+    def _run_inotify(self) -> None:
+        fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            print("Error: inotify unavailable, polling the projects folder instead.")
+            self._run_polling()
+            return
+
+        # Watch descriptor -> project name; None stands for the projects folder itself.
+        watches: dict[int, str | None] = {self._add_watch(fd, self.projects_folder, self.FOLDER_MASK): None}
+
+        try:
+            # Catch changes made between the startup scan and the watches being in place.
+            self._watch_projects(fd, watches)
+            self._rescan()
+            while not self._stop_event.is_set():
+                ready, _, _ = select.select([fd], [], [], self.SELECT_TIMEOUT_SECONDS)
+                if not ready:
+                    continue
+                try:
+                    buffer = os.read(fd, self.READ_BUFFER_SIZE)
+                except BlockingIOError:
+                    continue
+
+                offset = 0
+                while offset < len(buffer):
+                    wd, mask, _cookie, name_length = self.EVENT_HEADER.unpack_from(buffer, offset)
+                    offset += self.EVENT_HEADER.size
+                    name = os.fsdecode(buffer[offset:offset + name_length].rstrip(b"\0"))
+                    offset += name_length
+                    self._handle_inotify_event(fd, watches, wd, mask, name)
+        finally:
+            os.close(fd)
+
+    def _handle_inotify_event(self, fd: int, watches: dict[int, str | None], wd: int, mask: int, name: str) -> None:
+        if mask & self.IN_Q_OVERFLOW:
+            # Events were lost, so fall back to comparing the whole folder once.
+            self._watch_projects(fd, watches)
+            self._rescan()
+            return
+        if mask & self.IN_IGNORED:
+            watches.pop(wd, None)
+            return
+        if wd not in watches:
+            return
+
+        project = watches[wd]
+        appeared = bool(mask & (self.IN_CREATE | self.IN_MOVED_TO | self.IN_CLOSE_WRITE))
+        if project is None:
+            if not mask & self.IN_ISDIR:
+                return
+            if appeared:
+                watches[self._add_watch(fd, os.path.join(self.projects_folder, name), self.PROJECT_MASK)] = name
+            else:
+                for project_wd in [key for key, value in watches.items() if value == name]:
+                    self._libc.inotify_rm_watch(fd, project_wd)
+            self._project_changed(name, appeared)
+        elif not mask & self.IN_ISDIR:
+            index = self.project_manager.frame_index_from_filename(name)
+            if index is not None:
+                self._frame_changed(project, index, appeared)
+
+    def cleanup(self) -> None:
+        """Stops the background watcher."""
+        self._stop_event.set()
+        self._thread.join(timeout=self.JOIN_TIMEOUT_SECONDS)
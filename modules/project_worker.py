@@ -0,0 +1,84 @@
+import os
+import queue
+import threading
+from abc import ABC, abstractmethod
+from typing import Any
+
+import cv2
+
+
+class ProjectWorker(ABC):
+    """Base class for modules that process projects in a background thread.
+
+    request_update() queues a project; a project that is already waiting is not queued
+    twice, since processing always works on its current frames. Subclasses implement
+    _process(). Projects deleted before their turn are skipped, and file or decoding
+    errors of one project are logged without stopping the worker.
+    """
+    JPG_EXTENSION = ".jpg"
+    JOIN_TIMEOUT_SECONDS = 1.0
+    THREAD_NAME = "project-worker"
+    TASK = "process"  # Completes "Failed to <TASK> project <name>" in error messages.
+
+    def __init__(self, config: dict[str, Any], state: Any, project_manager: Any) -> None:
+        """Starts the background worker."""
+        self.config = config
+        self.state = state
+        self.project_manager = project_manager
+
+        self._stopping = False  # Lets long runs of _process() end early on cleanup.
+        self._queued_projects: set[str] = set()
+        self._active_project: str | None = None
+        self._queue_lock = threading.Lock()
+        self._requests: queue.Queue[str | None] = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name=self.THREAD_NAME, daemon=True)
+        self._thread.start()
+
+    def request_update(self, project: str) -> None:
+        """Queues processing a project, unless it is waiting already."""
+        with self._queue_lock:
+            if project in self._queued_projects:
+                return
+            self._queued_projects.add(project)
+        self._requests.put(project)
+
+    def is_pending(self, project: str) -> bool:
+        """Returns whether processing of a project is queued or running."""
+        with self._queue_lock:
+            return project in self._queued_projects or project == self._active_project
+
+    @abstractmethod
+    def _process(self, project: str) -> None:
+        """Processes one project in the worker thread."""
+
+    def _is_written(self, project: str, img_index: int) -> bool:
+        """Returns whether a frame is on disk.
+
+        Captures are encoded and written in the background, so the newest frame may not be
+        there yet. Work that needs it is left for the request of the next capture.
+        """
+        return os.path.exists(f"{self.project_manager.project_image_base_path(project)}{img_index}{self.JPG_EXTENSION}")
+
+    def _run(self) -> None:
+        while True:
+            project = self._requests.get()
+            if project is None:
+                return
+            with self._queue_lock:
+                self._queued_projects.discard(project)
+                self._active_project = project
+            try:
+                if project in self.state.projects_dict:
+                    self._process(project)
+            except (OSError, KeyError, cv2.error) as exc:
+                # KeyError: the project was deleted while it was processed; its removal is applied separately.
+                print(f"Error: Failed to {self.TASK} project {project}: {exc}")
+            finally:
+                with self._queue_lock:
+                    self._active_project = None
+
+    def cleanup(self) -> None:
+        """Stops the background worker."""
+        self._stopping = True
+        self._requests.put(None)
+        self._thread.join(timeout=self.JOIN_TIMEOUT_SECONDS)
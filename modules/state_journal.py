@@ -0,0 +1,136 @@
+import os
+import struct
+import time
+import zlib
+from pathlib import Path
+from typing import Any
+
+
+class StateJournal:
+    """Crash-safe store for the recording session state (project, next image index, start time).
+
+    Each update is appended as a fixed-size record with a sequence number and a CRC32,
+    so a torn write only invalidates the record being written and the previous one is
+    recovered. Updates are coalesced and written with one fsync at most every
+    durability window; the journal is compacted into a fresh file when it grows too long.
+    """
+    MAGIC = b"TLJ1"
+    RECORD_FORMAT = struct.Struct("<4sQqdH255s")  # magic, sequence, img index, start time, name length, name
+    CHECKSUM_FORMAT = struct.Struct("<I")
+    RECORD_SIZE = 512  # Padded so a record never straddles a disk sector.
+    MAX_RECORDS = 1024
+    DEFAULT_DURABILITY_SECONDS = 60.0
+    OPEN_FLAGS = getattr(os, "O_BINARY", 0)  # Keeps Windows from translating newlines.
+
+    def __init__(self, path: Path, config: dict[str, Any]) -> None:
+        """Prepares the journal; the file is opened on the first write."""
+        self.path = path
+        self.durability_seconds = config.get("state_durability_seconds", self.DEFAULT_DURABILITY_SECONDS)
+
+        self._sequence = 0
+        self._record_count = 0
+        self._pending: tuple[str | None, int, float] | None = None
+        self._last_flush_time = 0.0
+        self._fd: int | None = None
+
+    def recover(self) -> tuple[str | None, int, float] | None:
+        """Returns the newest valid (project name, image index, program start time), if any."""
+        try:
+            data = self.path.read_bytes()
+        except FileNotFoundError:
+            return None
+
+        latest = None
+        latest_sequence = -1
+        self._record_count = 0
+        for offset in range(0, len(data) - self.RECORD_SIZE + 1, self.RECORD_SIZE):
+            record = self._decode(data[offset:offset + self.RECORD_SIZE])
+            if record is None:
+                continue
+            self._record_count += 1
+            sequence, state = record
+            if sequence > latest_sequence:
+                latest_sequence, latest = sequence, state
+
+        self._sequence = latest_sequence + 1
+        if len(data) % self.RECORD_SIZE:
+            # A torn tail would misalign every later record, so start a fresh file on the next write.
+            self._record_count = self.MAX_RECORDS
+        return latest
+
+    def record(self, project_name: str | None, img_index: int, program_start_time: float) -> None:
+        """Queues a state update; it is written once the durability window has passed."""
+        self._pending = (project_name, img_index, program_start_time)
+        self.poll()
+
+    def poll(self) -> None:
+        """Writes a queued update if the durability window has passed; call once per main loop tick."""
+        if self._pending is not None and time.monotonic() - self._last_flush_time >= self.durability_seconds:
+            self.flush()
+
+    def flush(self) -> None:
+        """Writes the queued update now and waits until it is on disk."""
+        if self._pending is None:
+            return
+        if self._record_count >= self.MAX_RECORDS:
+            self._compact()
+        else:
+            if self._fd is None:
+                self._fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_APPEND | self.OPEN_FLAGS, 0o644)
+            os.write(self._fd, self._encode(self._sequence, *self._pending))
+            os.fsync(self._fd)
+            self._record_count += 1
+
+        self._sequence += 1
+        self._pending = None
+        self._last_flush_time = time.monotonic()
+
+    def _compact(self) -> None:
+        """Replaces the journal with a file holding only the queued state."""
+        tmp_path = self.path.with_name(f"{self.path.name}.tmp")
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | self.OPEN_FLAGS, 0o644)
+        try:
+            os.write(fd, self._encode(self._sequence, *self._pending))
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        os.replace(tmp_path, self.path)
+        self._sync_directory()
+        self._record_count = 1
+
+    def _sync_directory(self) -> None:
+        # Makes the rename itself durable; directories cannot be opened on Windows.
+        if not hasattr(os, "O_DIRECTORY"):
+            return
+        dir_fd = os.open(self.path.parent, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+    def _encode(self, sequence: int, project_name: str | None, img_index: int, program_start_time: float) -> bytes:
+        name = (project_name or "").encode("utf-8")
+        body = self.RECORD_FORMAT.pack(self.MAGIC, sequence, img_index, program_start_time, len(name), name)
+        body = body.ljust(self.RECORD_SIZE - self.CHECKSUM_FORMAT.size, b"\0")
+        return body + self.CHECKSUM_FORMAT.pack(zlib.crc32(body))
+
+    def _decode(self, record: bytes) -> tuple[int, tuple[str | None, int, float]] | None:
+        body, checksum = record[:-self.CHECKSUM_FORMAT.size], record[-self.CHECKSUM_FORMAT.size:]
+        if self.CHECKSUM_FORMAT.unpack(checksum)[0] != zlib.crc32(body):
+            return None
+        magic, sequence, img_index, program_start_time, name_length, name = self.RECORD_FORMAT.unpack_from(body)
+        if magic != self.MAGIC:
+            return None
+        project_name = name[:name_length].decode("utf-8", "replace") or None
+        return sequence, (project_name, img_index, program_start_time)
+
+    def cleanup(self) -> None:
+        """Writes any queued update and closes the journal."""
+        self.flush()
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
@@ -0,0 +1,296 @@
+import asyncio
+import json
+import math
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable
+from urllib.parse import parse_qs, unquote, urlsplit
+
+
+class _FrameChannel:
+    """Fans the JPEG frames of one source out to all subscribed clients."""
+
+    def __init__(self) -> None:
+        self.subscribers: set[asyncio.Queue[bytes | None]] = set()
+        self.producer: asyncio.Task[None] | None = None
+        self.latest: bytes | None = None
+
+    def subscribe(self) -> asyncio.Queue[bytes | None]:
+        client_queue: asyncio.Queue[bytes | None] = asyncio.Queue(maxsize=1)
+        # Clients joining a paused source still get the current frame right away.
+        if self.latest is not None:
+            client_queue.put_nowait(self.latest)
+        self.subscribers.add(client_queue)
+        return client_queue
+
+    def publish(self, jpeg: bytes) -> None:
+        self.latest = jpeg
+        for client_queue in self.subscribers:
+            # A client that has not sent the previous frame yet only gets the newest one.
+            if client_queue.full():
+                client_queue.get_nowait()
+            client_queue.put_nowait(jpeg)
+
+    def close(self) -> None:
+        """Ends the streams of all subscribed clients; None marks the end."""
+        for client_queue in self.subscribers:
+            if client_queue.full():
+                client_queue.get_nowait()
+            client_queue.put_nowait(None)
+
+
+class _ProjectCursor:
+    """Plays a project at a fixed speed, independent of the display."""
+
+    def __init__(self, server: "StreamServer", project: str, speed: float) -> None:
+        self.server = server
+        self.project = project
+        self.speed = speed
+        self.position = 0
+        self.accumulator = 0.0
+
+    def next_path(self) -> str | None:
+        project_info = self.server.state.projects_dict.get(self.project)
+        if project_info is None or not project_info["indices"]:
+            return None
+
+        indices = project_info["indices"]
+        delta_seconds = project_info["frame_delta_seconds"]
+        delta_seconds = max(1e-6, delta_seconds or float(self.server.config["capture_interval"]))
+        self.accumulator += self.speed / self.server.STREAM_FPS / delta_seconds
+        frame_step = int(self.accumulator)
+        self.accumulator -= frame_step
+        self.position = (self.position + frame_step) % len(indices)
+        return self.server.frame_path(self.project, indices[self.position])
+
+
+class StreamServer:
+    """Serves MJPEG streams and a JSON status endpoint over HTTP on the local network.
+
+    Frames are sent as the JPEG bytes stored on disk, without decoding or re-encoding.
+    Each source is read once per frame and shared by all of its clients.
+
+    Routes:
+        /status                         JSON summary of the program state
+        /stream                         current playback position of the display
+        /live                           latest captured frame of the recording project
+        /project/<name>?speed=<x>       a project played at its own speed
+    """
+    STREAM_FPS = 10
+    BOUNDARY = "frame"
+    JPG_EXTENSION = ".jpg"
+    DEFAULT_HOST = "0.0.0.0"
+    DEFAULT_PORT = 8080
+    DEFAULT_PROJECT_SPEED = 4096
+    START_TIMEOUT_SECONDS = 5.0
+    JOIN_TIMEOUT_SECONDS = 2.0
+
+    def __init__(self, config: dict[str, Any], state: Any) -> None:
+        """Initializes the server; call start() to begin serving in a background thread."""
+        self.config = config
+        self.state = state
+        self.host = self.config.get("stream_server_host", self.DEFAULT_HOST)
+        self.port = self.config.get("stream_server_port", self.DEFAULT_PORT)
+
+        self._channels: dict[tuple[Any, ...], _FrameChannel] = {}
+        self._client_tasks: set[asyncio.Task[Any]] = set()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._stop_event: asyncio.Event | None = None
+        self._ready = threading.Event()
+        self._start_error: OSError | None = None
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """Starts serving in a background thread and waits until the socket is bound.
+
+        Raises the OSError of binding the socket (e.g. the port is in use), or RuntimeError on a timeout.
+        """
+        self._thread = threading.Thread(target=asyncio.run, args=(self._serve(),), name="stream-server", daemon=True)
+        self._thread.start()
+        if not self._ready.wait(self.START_TIMEOUT_SECONDS):
+            raise RuntimeError("Stream server failed to start")
+        if self._start_error is not None:
+            raise self._start_error
+        print(f"Stream server listening on http://{self.host}:{self.port}/")
+
+    def frame_path(self, project: str, img_index: int) -> str:
+        return str(Path(self.config["projects_folder"]) / project / f"{self.state.img_file_prefix}{img_index}{self.JPG_EXTENSION}")
+
+    def status(self) -> dict[str, Any]:
+        """Builds a JSON-serializable summary of the program state."""
+        display_project = self.state.project_name_display
+        return {
+            "projects": {
+                project: len(self.state.projects_dict[project]["indices"])
+                for project in self.state.projects
+            },
+            "display": {
+                "project": display_project,
+                "position": self.state.img_index_display,
+                "frames": len(self.state.img_indices_display),
+                "playback_speed": self.state.playback_speed,
+                "is_paused": self.state.is_paused,
+                "is_default_mode": self.state.is_default_mode,
+            },
+            "record": {
+                "project": self.state.project_name_record,
+                "img_index": self.state.img_index_record,
+                "frames": len(self.state.img_indices_record),
+            },
+            "program_start_time": self.state.program_start_time,
+            "uptime_seconds": time.time() - self.state.program_start_time,
+        }
+
+    def _playback_frame_path(self) -> str | None:
+        indices = self.state.img_indices_display
+        position = self.state.img_index_display
+        if not indices or position < 0 or position >= len(indices):
+            return None
+        return f"{self.state.base_url_display}{indices[position]}{self.JPG_EXTENSION}"
+
+    def _live_frame_path(self) -> str | None:
+        if not self.state.img_indices_record:
+            return None
+        return f"{self.state.base_url_record}{self.state.img_indices_record[-1]}{self.JPG_EXTENSION}"
+
+    @staticmethod
+    def _read_file(path: str) -> bytes | None:
+        try:
+            return Path(path).read_bytes()
+        except OSError:
+            return None
+
+    async def _serve(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._stop_event = asyncio.Event()
+        try:
+            server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        except OSError as exc:
+            self._start_error = exc  # Raised by start() in the caller's thread.
+            self._ready.set()
+            return
+        # Report the actual port when the config asks for an ephemeral one (0).
+        self.port = server.sockets[0].getsockname()[1]
+        self._ready.set()
+
+        async with server:
+            await self._stop_event.wait()
+            # Streams never end on their own, so cancel them before the server waits for its clients.
+            tasks = list(self._client_tasks)
+            tasks += [channel.producer for channel in self._channels.values() if channel.producer is not None]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        client_task = asyncio.current_task()
+        self._client_tasks.add(client_task)
+        try:
+            request_line = (await reader.readline()).decode("latin-1").split()
+            while (await reader.readline()).strip():
+                pass  # Headers are not needed.
+
+            if len(request_line) < 2 or request_line[0] != "GET":
+                await self._send_response(writer, 405, "text/plain", b"Method Not Allowed")
+                return
+
+            url = urlsplit(request_line[1])
+            route = [unquote(part) for part in url.path.strip("/").split("/") if part]
+            if route == ["status"]:
+                body = json.dumps(self.status()).encode("utf-8")
+                await self._send_response(writer, 200, "application/json", body)
+            elif route == ["stream"]:
+                await self._stream(writer, ("playback",), self._playback_frame_path)
+            elif route == ["live"]:
+                await self._stream(writer, ("live",), self._live_frame_path)
+            elif len(route) == 2 and route[0] == "project" and route[1] in self.state.projects_dict:
+                query = parse_qs(url.query)
+                try:
+                    speed = float(query.get("speed", [self.DEFAULT_PROJECT_SPEED])[0])
+                except ValueError:
+                    speed = math.nan  # Rejected below, like inf.
+                if not math.isfinite(speed):
+                    await self._send_response(writer, 400, "text/plain", b"Invalid speed")
+                    return
+                cursor = _ProjectCursor(self, route[1], speed)
+                await self._stream(writer, ("project", route[1], speed), cursor.next_path)
+            else:
+                await self._send_response(writer, 404, "text/plain", b"Not Found")
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            pass  # The server is shutting down; close the connection normally.
+        finally:
+            self._client_tasks.discard(client_task)
+            writer.close()
+
+    async def _send_response(self, writer: asyncio.StreamWriter, status: int, content_type: str, body: bytes) -> None:
+        reason = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed"}[status]
+        writer.write(
+            f"HTTP/1.1 {status} {reason}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Connection: close\r\n\r\n".encode("latin-1") + body
+        )
+        await writer.drain()
+
+    async def _stream(self, writer: asyncio.StreamWriter, channel_key: tuple[Any, ...], next_path: Callable[[], str | None]) -> None:
+        """Subscribes a client to a channel and writes its frames as multipart JPEG parts."""
+        channel = self._channels.get(channel_key)
+        if channel is None:
+            channel = _FrameChannel()
+            self._channels[channel_key] = channel
+        client_queue = channel.subscribe()
+        if channel.producer is None:
+            channel.producer = asyncio.create_task(self._produce(channel_key, channel, next_path))
+
+        try:
+            writer.write(
+                "HTTP/1.1 200 OK\r\n"
+                f"Content-Type: multipart/x-mixed-replace; boundary={self.BOUNDARY}\r\n"
+                "Cache-Control: no-cache\r\n"
+                "Connection: close\r\n\r\n".encode("latin-1")
+            )
+            while True:
+                jpeg = await client_queue.get()
+                if jpeg is None:
+                    return  # The source failed.
+                writer.write(
+                    f"--{self.BOUNDARY}\r\n"
+                    "Content-Type: image/jpeg\r\n"
+                    f"Content-Length: {len(jpeg)}\r\n\r\n".encode("latin-1")
+                )
+                writer.write(jpeg)
+                writer.write(b"\r\n")
+                # Waiting here is the per-client backpressure; the channel drops frames meanwhile.
+                await writer.drain()
+        finally:
+            channel.subscribers.discard(client_queue)
+
+    async def _produce(self, channel_key: tuple[Any, ...], channel: _FrameChannel, next_path: Callable[[], str | None]) -> None:
+        """Reads each new frame of a source once and publishes it to the channel."""
+        loop = asyncio.get_running_loop()
+        last_path = None
+        try:
+            while channel.subscribers:
+                path = next_path()
+                if path is not None and path != last_path:
+                    jpeg = await loop.run_in_executor(None, self._read_file, path)
+                    if jpeg:
+                        channel.publish(jpeg)
+                        last_path = path
+                await asyncio.sleep(1.0 / self.STREAM_FPS)
+        except Exception as exc:
+            # Without this, clients would wait forever for the next frame of a dead producer.
+            print(f"Error: Stream source {channel_key} failed: {exc}")
+        finally:
+            self._channels.pop(channel_key, None)
+            channel.close()
+
+    def cleanup(self) -> None:
+        """Stops the server and disconnects all clients."""
+        if self._loop is not None and self._stop_event is not None:
+            self._loop.call_soon_threadsafe(self._stop_event.set)
+        if self._thread is not None:
+            self._thread.join(timeout=self.JOIN_TIMEOUT_SECONDS)
@@ -0,0 +1,210 @@
+import os
+from typing import Any
+
+import cv2
+import numpy as np
+
+from modules.camera_capture import CameraCapture
+from modules.project_worker import ProjectWorker
+
+
+class SummaryFrames(ProjectWorker):
+    """Low-resolution averages of consecutive frames for previews at extreme playback speeds.
+
+    Level k holds the average of each run of 2**k frames, starting at MIN_LEVEL. The lowest
+    level is accumulated from reduced decodes of the frames, every higher level from pairs
+    of the level below, so each frame is decoded only once. Levels are stored as raw
+    files next to the frames and only grow at their end as captures arrive. At display
+    time, the level that matches the playback stride is looked up with a single read.
+    """
+    CATALOG_KEY = "summary"
+    FILENAME_TEMPLATE = "summary_{level}.bin"
+    THREAD_NAME = "summary-frames"
+    TASK = "build summary frames of"
+    MIN_LEVEL = 5  # Averages of 32 frames; smaller strides show the frames themselves.
+    MAX_LEVEL = 24
+    SIZE_DIVISOR = 8  # Matches cv2.IMREAD_REDUCED_COLOR_8, so frames need no resize.
+    SAVE_EVERY_FRAMES = 4096
+    CHUNK_ROWS = 256
+
+    def __init__(self, config: dict[str, Any], state: Any, project_manager: Any, timestamp_index: Any) -> None:
+        """Starts the background worker that builds the summary levels."""
+        super().__init__(config, state, project_manager)
+        self.timestamp_index = timestamp_index
+
+        self.size = (self.config["width"] // self.SIZE_DIVISOR, self.config["height"] // self.SIZE_DIVISOR)
+        self.row_shape = (self.size[1], self.size[0], 3)
+        self.row_bytes = self.size[0] * self.size[1] * 3
+        self.min_stride = 1 << self.MIN_LEVEL
+
+        # Per project: frames covered so far and the frame indices that pin them down.
+        self._summaries: dict[str, dict[str, Any]] = {}
+
+    def frame_captured(self, project: str) -> None:
+        """Extends the summary levels of a project after a capture, if they have been built already."""
+        if project in self._summaries:
+            self.request_update(project)
+
+    def frames_changed(self, project: str, removed: list[int]) -> None:
+        """Rebuilds the summary levels of a project whose frames were added or removed outside of capturing."""
+        summary = self._summaries.pop(project, None)
+        if summary is None:
+            return  # Not built yet; frame_at() requests it for the current frames.
+        if removed and summary["frames"] and min(removed) <= summary["last_index"]:
+            # Averages include removed frames; the stored levels are discarded as well.
+            self.project_manager.catalog.update(project, **{self.CATALOG_KEY: None})
+        self.request_update(project)
+
+    def project_removed(self, project: str) -> None:
+        """Forgets the summary levels of a deleted project."""
+        self._summaries.pop(project, None)
+
+    def frame_at(self, project: str, position: int, stride: int) -> Any | None:
+        """Returns the averaged frame around a position for a playback stride, or None to show the frame itself."""
+        if stride < self.min_stride:
+            return None
+        summary = self._summaries.get(project)
+        if summary is None:
+            self.request_update(project)
+            return None
+
+        # Use the level matching the stride; near the end of the project only lower levels may be complete.
+        level = min(stride.bit_length() - 1, self.MAX_LEVEL)
+        while level >= self.MIN_LEVEL and position >> level >= summary["frames"] >> level:
+            level -= 1
+        if level < self.MIN_LEVEL:
+            return None
+
+        try:
+            row = np.fromfile(
+                self._level_path(project, level),
+                dtype=np.uint8,
+                count=self.row_bytes,
+                offset=(position >> level) * self.row_bytes,
+            )
+        except OSError:
+            return None  # Being rebuilt.
+        if row.size != self.row_bytes:
+            return None
+        frame = cv2.resize(row.reshape(self.row_shape), (self.config["width"], self.config["height"]))
+
+        # The averaged timestamp pixels are meaningless; stamp the time of the position for the UI.
+        elapsed_seconds = self.timestamp_index.cached_elapsed_at(project, position)
+        if elapsed_seconds is None:
+            return None
+        CameraCapture.stamp_timestamp(frame, elapsed_seconds, self.config["pixels_for_timestamp"])
+        return frame
+
+    def _level_path(self, project: str, level: int) -> str:
+        return os.path.join(self.config["projects_folder"], project, self.FILENAME_TEMPLATE.format(level=level))
+
+    def _process(self, project: str) -> None:
+        """Appends the averages of every run of frames completed since the last update."""
+        indices = list(self.state.projects_dict[project]["indices"])
+        self.timestamp_index.timestamps(project)  # Builds the array frame_at() stamps the time from.
+        summary = self._summaries.get(project) or self._load(project)
+        if summary is None or not self._is_valid(summary, indices):
+            self._summaries.pop(project, None)
+            summary = self._reset(project)
+
+        target = len(indices) >> self.MIN_LEVEL << self.MIN_LEVEL
+        if target and not self._is_written(project, indices[target - 1]):
+            target -= self.min_stride
+        if summary["frames"] >= target:
+            self._summaries[project] = summary
+            return
+
+        print(f"Building summary frames of {target - summary['frames']} frames in project: {project}")
+        while summary["frames"] < target and not self._stopping:
+            frames = min(target, summary["frames"] + self.SAVE_EVERY_FRAMES)
+            self._extend(project, indices, summary["frames"], frames)
+            summary = {"frames": frames, "first_index": indices[0], "last_index": indices[frames - 1]}
+            self._save(project, summary)
+            self._summaries[project] = summary
+
+    def _is_valid(self, summary: dict[str, Any], indices: list[int]) -> bool:
+        """Checks that the frames covered by the summary are still the same frames."""
+        frames = summary["frames"]
+        if frames == 0:
+            return True
+        return (
+            len(indices) >= frames
+            and indices[0] == summary["first_index"]
+            and indices[frames - 1] == summary["last_index"]
+        )
+
+    def _extend(self, project: str, indices: list[int], start: int, end: int) -> None:
+        """Adds the averages of the frames between two list positions to every level."""
+        group = self.min_stride
+        base_path = self.project_manager.project_image_base_path(project)
+        accumulator = np.zeros(self.row_shape, np.uint32)
+        with open(self._level_path(project, self.MIN_LEVEL), "ab") as level_file:
+            for group_start in range(start, end, group):
+                accumulator.fill(0)
+                decoded = 0
+                for img_index in indices[group_start:group_start + group]:
+                    frame = cv2.imread(f"{base_path}{img_index}{self.JPG_EXTENSION}", cv2.IMREAD_REDUCED_COLOR_8)
+                    if frame is None:
+                        continue
+                    if frame.shape != self.row_shape:
+                        frame = cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA)
+                    np.add(accumulator, frame, out=accumulator)
+                    decoded += 1
+                if decoded:
+                    accumulator += decoded // 2  # Round to nearest.
+                    accumulator //= decoded
+                level_file.write(accumulator.astype(np.uint8).tobytes())
+
+        for level in range(self.MIN_LEVEL + 1, self.MAX_LEVEL + 1):
+            first_row, end_row = start >> level, end >> level
+            if end_row == 0:
+                break
+            if first_row == end_row:
+                continue
+            source = np.memmap(
+                self._level_path(project, level - 1),
+                dtype=np.uint8,
+                mode="r",
+                shape=(end_row * 2,) + self.row_shape,
+            )
+            with open(self._level_path(project, level), "ab") as level_file:
+                for chunk_start in range(first_row, end_row, self.CHUNK_ROWS):
+                    chunk_end = min(chunk_start + self.CHUNK_ROWS, end_row)
+                    pairs = source[chunk_start * 2:chunk_end * 2].reshape((-1, 2) + self.row_shape)
+                    averages = (pairs.sum(axis=1, dtype=np.uint16) + 1) >> 1
+                    level_file.write(averages.astype(np.uint8).tobytes())
+            del source
+
+    def _reset(self, project: str) -> dict[str, Any]:
+        """Removes the stored levels of a project so they are built from scratch."""
+        for level in range(self.MIN_LEVEL, self.MAX_LEVEL + 1):
+            path = self._level_path(project, level)
+            if os.path.exists(path):
+                os.remove(path)
+        return {"frames": 0, "first_index": None, "last_index": None}
+
+    def _load(self, project: str) -> dict[str, Any] | None:
+        stored = self.project_manager.catalog.load(project).get(self.CATALOG_KEY)
+        if not stored or stored.get("size") != list(self.size) or stored.get("min_level") != self.MIN_LEVEL:
+            return None  # Missing, or built for another frame size.
+
+        # Rows appended after the last catalog update are dropped so every level matches the catalog.
+        frames = stored["frames"]
+        for level in range(self.MIN_LEVEL, self.MAX_LEVEL + 1):
+            rows = frames >> level
+            path = self._level_path(project, level)
+            if not os.path.exists(path):
+                if rows:
+                    return None
+                continue
+            if os.path.getsize(path) < rows * self.row_bytes:
+                return None
+            os.truncate(path, rows * self.row_bytes)
+        return {"frames": frames, "first_index": stored["first_index"], "last_index": stored["last_index"]}
+
+    def _save(self, project: str, summary: dict[str, Any]) -> None:
+        self.project_manager.catalog.update(project, **{self.CATALOG_KEY: {
+            "size": list(self.size),
+            "min_level": self.MIN_LEVEL,
+            **summary,
+        }})
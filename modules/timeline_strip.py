@@ -0,0 +1,260 @@
+import bisect
+import os
+from typing import Any
+
+import cv2
+import numpy as np
+
+from modules.project_worker import ProjectWorker
+
+
+class TimelineStrip(ProjectWorker):
+    """Precomputed strip of tiny thumbnails across a project's time range, drawn as a scrub bar.
+
+    The time range is split into SEGMENT_COUNT segments of equal duration. Each segment
+    shows the frame at its start. When captures run past the last segment, neighbouring
+    segments are merged pairwise and the duration doubles, so the strip only ever grows
+    at its end and existing thumbnails never need to be decoded again. Thumbnails are
+    built in a background thread and stored next to the frames (timeline.jpg plus a
+    catalog entry). Drawing costs one blit and a marker line per frame; the marker is
+    placed from the first list position of each segment, cached with the strip.
+
+    The per-segment activity (mean change to the previous thumbnail) is kept with the
+    strip and used to jump to the next busy part of a project.
+    """
+    CATALOG_KEY = "timeline"
+    STRIP_FILENAME = "timeline.jpg"
+    THREAD_NAME = "timeline-strip"
+    TASK = "build the timeline of"
+    SEGMENT_COUNT = 32
+    THUMBNAIL_HEIGHT = 40
+    MARKER_WIDTH = 3
+    MARKER_COLOR = (0, 0, 255)
+    JPEG_QUALITY = 85
+
+    def __init__(self, config: dict[str, Any], state: Any, project_manager: Any, timestamp_index: Any) -> None:
+        """Starts the background worker that builds the strips."""
+        super().__init__(config, state, project_manager)
+        self.timestamp_index = timestamp_index
+
+        self.strip_length = self.config["width"] if self.config["landscape"] else self.config["height"]
+        self.thumbnail_width = self.strip_length // self.SEGMENT_COUNT
+
+        # Per project: segment_seconds, start_seconds, thumbnails, activity, the rendered strip,
+        # segment_positions (first list position of each segment) and frames (list length).
+        self._strips: dict[str, dict[str, Any]] = {}
+        self._unindexed_projects: set[str] = set()  # Waiting for real timestamps; draw() asks again.
+
+    def draw(self, frame: Any, project: str, position: int) -> Any:
+        """Blits the strip of a project onto the frame and marks the playback position."""
+        strip = self._strips.get(project)
+        if strip is None or project in self._unindexed_projects:
+            self.request_update(project)
+        if strip is None:
+            return frame
+
+        rendered = strip["rendered"]
+        strip_height = rendered.shape[0] if self.config["landscape"] else rendered.shape[1]
+        marker = self._marker_offset(strip, position)
+
+        if self.config["landscape"]:
+            if frame.shape[0] < strip_height or frame.shape[1] < self.strip_length:
+                return frame
+            top = frame.shape[0] - strip_height
+            frame[top:, :self.strip_length] = rendered
+            if marker is not None:
+                frame[top:, marker:marker + self.MARKER_WIDTH] = self.MARKER_COLOR
+        else:
+            # Rotated like the UI bar; time runs from the bottom to the top.
+            if frame.shape[1] < strip_height or frame.shape[0] < self.strip_length:
+                return frame
+            left = frame.shape[1] - strip_height
+            frame[:self.strip_length, left:] = rendered
+            if marker is not None:
+                row = self.strip_length - marker - self.MARKER_WIDTH
+                frame[row:row + self.MARKER_WIDTH, left:] = self.MARKER_COLOR
+        return frame
+
+    def _marker_offset(self, strip: dict[str, Any], position: int) -> int | None:
+        """Maps a list position to a pixel offset along the strip without touching the timestamp index."""
+        segment_positions = strip["segment_positions"]
+        if not segment_positions:
+            return None
+        # Empty segments share their start with the next one; bisect_right picks the segment holding frames.
+        segment = max(0, bisect.bisect_right(segment_positions, position) - 1)
+        segment_start = segment_positions[segment]
+        segment_end = segment_positions[segment + 1] if segment + 1 < len(segment_positions) else strip["frames"]
+        within = (position - segment_start) / (segment_end - segment_start) if segment_end > segment_start else 0.0
+        offset = int((segment + min(max(within, 0.0), 1.0)) * self.strip_length / self.SEGMENT_COUNT)
+        return min(offset, self.strip_length - self.MARKER_WIDTH)
+
+    def frames_changed(self, project: str, removed: list[int]) -> None:
+        """Rebuilds the strip of a project whose frames were added or removed outside of capturing."""
+        if project not in self._strips:
+            return  # Nothing cached; draw() builds the strip from the current frames.
+        if removed:
+            # Thumbnails may show removed frames; the stored strip is discarded as well.
+            del self._strips[project]
+            self.project_manager.catalog.update(project, **{self.CATALOG_KEY: None})
+        self.request_update(project)
+
+    def project_removed(self, project: str) -> None:
+        """Forgets the strip of a deleted project."""
+        self._strips.pop(project, None)
+        self._unindexed_projects.discard(project)
+
+    def frame_captured(self, project: str) -> None:
+        """Extends the strip of a project after a capture, if it has been built already."""
+        if project in self._strips:
+            self.request_update(project)
+
+    def next_active_elapsed(self, project: str, elapsed_seconds: float) -> float | None:
+        """Returns the start of the next segment after the given time with above-median activity."""
+        strip = self._strips.get(project)
+        if strip is None or not strip["activity"]:
+            return None
+
+        threshold = float(np.median(strip["activity"]))
+        first_segment = int((elapsed_seconds - strip["start_seconds"]) // strip["segment_seconds"]) + 1
+        for segment in range(max(first_segment, 0), len(strip["activity"])):
+            if strip["activity"][segment] > threshold:
+                return strip["start_seconds"] + segment * strip["segment_seconds"]
+        return None
+
+    def _process(self, project: str) -> None:
+        """Loads the stored strip and adds thumbnails for segments that gained their first frame."""
+        if not self.timestamp_index.is_indexed(project):
+            # Segments laid out from estimated timestamps would stay wrong; the current strip is kept meanwhile.
+            self._unindexed_projects.add(project)
+            self.timestamp_index.timestamps(project)  # Loads the project and starts its scan.
+            return
+        self._unindexed_projects.discard(project)
+        timestamps = self.timestamp_index.timestamps(project)
+        if not timestamps:
+            return
+
+        # Work on a copy; the main thread keeps drawing the current strip meanwhile.
+        strip = self._strips.get(project)
+        if strip is not None:
+            strip = dict(strip, thumbnails=list(strip["thumbnails"]))
+        else:
+            strip = self._load(project)
+        if strip is None:
+            delta_seconds = max(1.0, self.project_manager.resolve_frame_delta_seconds(project))
+            strip = {
+                "segment_seconds": delta_seconds,
+                "start_seconds": timestamps[0],
+                "thumbnails": [],
+                "activity": [],
+            }
+
+        # Merge pairs of segments until the strip covers the whole project.
+        while timestamps[-1] >= strip["start_seconds"] + self.SEGMENT_COUNT * strip["segment_seconds"]:
+            thumbnails = strip["thumbnails"]
+            strip["thumbnails"] = [
+                first if first is not None else second
+                for first, second in zip(thumbnails[0::2], thumbnails[1::2] + [None])
+            ]
+            strip["segment_seconds"] *= 2
+            strip["activity"] = self._activity_levels(strip["thumbnails"])
+
+        changed = False
+        last_segment = int((timestamps[-1] - strip["start_seconds"]) // strip["segment_seconds"])
+        indices = self.state.projects_dict[project]["indices"]
+        while len(strip["thumbnails"]) <= last_segment:
+            segment = len(strip["thumbnails"])
+            thumbnail = None
+            position = self._segment_position(timestamps, strip, segment)
+            if position is not None and position < len(indices):  # Frames may be removed while building.
+                if segment == last_segment and not self._is_written(project, indices[position]):
+                    break
+                thumbnail = self._decode_thumbnail(project, indices[position])
+            strip["thumbnails"].append(thumbnail)
+            changed = True
+
+        if changed or "rendered" not in strip:
+            strip["activity"] = self._activity_levels(strip["thumbnails"])
+            strip["rendered"] = self._render(strip["thumbnails"])
+        # Refreshed on every update, as each capture moves the end of the last segment.
+        strip["segment_positions"] = [
+            bisect.bisect_left(timestamps, strip["start_seconds"] + segment * strip["segment_seconds"])
+            for segment in range(len(strip["thumbnails"]))
+        ]
+        strip["frames"] = len(timestamps)
+        self._strips[project] = strip
+        if changed:
+            self._save(project, strip)
+
+    def _segment_position(self, timestamps: list[int], strip: dict[str, Any], segment: int) -> int | None:
+        """Returns the list position of the first frame of a segment, or None if it has no frames."""
+        segment_start = strip["start_seconds"] + segment * strip["segment_seconds"]
+        position = bisect.bisect_left(timestamps, segment_start)
+        if position >= len(timestamps) or timestamps[position] >= segment_start + strip["segment_seconds"]:
+            return None
+        return position
+
+    def _decode_thumbnail(self, project: str, img_index: int) -> Any | None:
+        img_path = f"{self.project_manager.project_image_base_path(project)}{img_index}{self.JPG_EXTENSION}"
+        # A reduced decode is enough for a thumbnail and several times faster.
+        frame = cv2.imread(img_path, cv2.IMREAD_REDUCED_COLOR_8)
+        if frame is None:
+            return None
+        return cv2.resize(frame, (self.thumbnail_width, self.THUMBNAIL_HEIGHT), interpolation=cv2.INTER_AREA)
+
+    def _activity_levels(self, thumbnails: list[Any | None]) -> list[float]:
+        activity = []
+        previous = None
+        for thumbnail in thumbnails:
+            if thumbnail is None or previous is None:
+                activity.append(0.0)
+            else:
+                activity.append(float(cv2.absdiff(thumbnail, previous).mean()))
+            previous = thumbnail
+        return activity
+
+    def _render(self, thumbnails: list[Any | None]) -> Any:
+        rendered = np.zeros((self.THUMBNAIL_HEIGHT, self.strip_length, 3), np.uint8)
+        for segment, thumbnail in enumerate(thumbnails):
+            if thumbnail is not None:
+                left = segment * self.thumbnail_width
+                rendered[:, left:left + self.thumbnail_width] = thumbnail
+        if not self.config["landscape"]:
+            rendered = cv2.rotate(rendered, cv2.ROTATE_90_COUNTERCLOCKWISE)
+        return rendered
+
+    def _strip_path(self, project: str) -> str:
+        return os.path.join(self.config["projects_folder"], project, self.STRIP_FILENAME)
+
+    def _load(self, project: str) -> dict[str, Any] | None:
+        stored = self.project_manager.catalog.load(project).get(self.CATALOG_KEY)
+        if not stored or stored.get("thumbnail_size") != [self.thumbnail_width, self.THUMBNAIL_HEIGHT]:
+            return None  # Missing, or built for another display size.
+        image = cv2.imread(self._strip_path(project))
+        if image is None:
+            return None
+
+        thumbnails = []
+        for segment, filled in enumerate(stored["filled"]):
+            left = segment * self.thumbnail_width
+            thumbnails.append(image[:, left:left + self.thumbnail_width].copy() if filled else None)
+        return {
+            "segment_seconds": stored["segment_seconds"],
+            "start_seconds": stored["start_seconds"],
+            "thumbnails": thumbnails,
+            "activity": stored["activity"],
+        }
+
+    def _save(self, project: str, strip: dict[str, Any]) -> None:
+        image = np.zeros((self.THUMBNAIL_HEIGHT, self.thumbnail_width * self.SEGMENT_COUNT, 3), np.uint8)
+        for segment, thumbnail in enumerate(strip["thumbnails"]):
+            if thumbnail is not None:
+                left = segment * self.thumbnail_width
+                image[:, left:left + self.thumbnail_width] = thumbnail
+        cv2.imwrite(self._strip_path(project), image, [cv2.IMWRITE_JPEG_QUALITY, self.JPEG_QUALITY])
+        self.project_manager.catalog.update(project, **{self.CATALOG_KEY: {
+            "segment_seconds": strip["segment_seconds"],
+            "start_seconds": strip["start_seconds"],
+            "thumbnail_size": [self.thumbnail_width, self.THUMBNAIL_HEIGHT],
+            "filled": [thumbnail is not None for thumbnail in strip["thumbnails"]],
+            "activity": strip["activity"],
+        }})
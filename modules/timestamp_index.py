@@ -0,0 +1,281 @@
+import bisect
+import os
+import threading
+from typing import Any
+
+import numpy as np
+
+from modules.project_worker import ProjectWorker
+
+
+class TimestampIndex(ProjectWorker):
+    """Keeps a sorted elapsed-time array per project for O(log n) seeking.
+
+    The array is aligned with the project's frame indices. Frames whose timestamp
+    has not been read yet are estimated from the frame delta; a background worker
+    reads the real timestamps from the frame pixels once and stores them in a binary file
+    next to the frames, keeping the JSON catalog small.
+    The array is built once per project: captures append to it, and the worker swaps
+    in a rebuilt array every SAVE_EVERY_FRAMES frames it reads. Frames can be removed or
+    renumbered while the program is not running, so before trusting the stored timestamps
+    the worker reads a sample of frames and reads everything again if most of them differ.
+    """
+    FILENAME = "timestamps.npy"
+    UNKNOWN_SECONDS = -1
+    THREAD_NAME = "timestamp-index"
+    TASK = "index timestamps of"
+    SAVE_EVERY_FRAMES = 5000
+    VERIFY_SAMPLE_FRAMES = 16
+
+    def __init__(self, config: dict[str, Any], state: Any, project_manager: Any) -> None:
+        """Starts the background worker that reads frame timestamps."""
+        super().__init__(config, state, project_manager)
+
+        self._known: dict[str, dict[int, int]] = {}
+        self._timestamps: dict[str, list[int]] = {}
+        self._dirty_projects: set[str] = set()
+        self._unverified_projects: set[str] = set()  # Stored timestamps not yet checked against the frames.
+        self._lock = threading.Lock()
+
+    def timestamps(self, project: str) -> list[int]:
+        """Returns the sorted elapsed seconds of every frame of a project."""
+        with self._lock:
+            self._load(project)
+            timestamps = self._timestamps.get(project)
+            if timestamps is None or len(timestamps) != len(self.state.projects_dict[project]["indices"]):
+                timestamps = self._build(project, self.state.projects_dict[project]["indices"], self._known[project])
+                self._timestamps[project] = timestamps
+            return timestamps
+
+    def elapsed_at(self, project: str, position: int) -> int:
+        """Returns the elapsed seconds of the frame at a list position."""
+        timestamps = self.timestamps(project)
+        if not timestamps:
+            return 0
+        return timestamps[max(0, min(position, len(timestamps) - 1))]
+
+    def cached_elapsed_at(self, project: str, position: int) -> int | None:
+        """Returns the elapsed seconds at a list position from the cached array, or None if it is not built.
+
+        Never builds the array or waits for the lock, so it is safe on the render path.
+        """
+        timestamps = self._timestamps.get(project)
+        if not timestamps:
+            return None
+        try:
+            return timestamps[max(0, min(position, len(timestamps) - 1))]
+        except IndexError:
+            return None  # A capture replaced the last entry meanwhile.
+
+    def position_for_elapsed(self, project: str, elapsed_seconds: float) -> int:
+        """Returns the list position of the frame closest to the given elapsed time."""
+        timestamps = self.timestamps(project)
+        if not timestamps:
+            return -1
+
+        position = bisect.bisect_left(timestamps, elapsed_seconds)
+        if position >= len(timestamps):
+            return len(timestamps) - 1
+        if position > 0 and elapsed_seconds - timestamps[position - 1] < timestamps[position] - elapsed_seconds:
+            return position - 1
+        return position
+
+    def is_indexed(self, project: str) -> bool:
+        """Returns whether every frame of a loaded project has its real timestamp, not an estimate."""
+        return project in self._known and not self.is_pending(project)
+
+    def record_capture(self, project: str, img_index: int, elapsed_seconds: int) -> None:
+        """Stores the exact timestamp of a freshly captured frame."""
+        with self._lock:
+            self._load(project)
+            self._known[project][img_index] = elapsed_seconds
+            self._dirty_projects.add(project)
+
+            # Captures append to the indices, so the cached array only needs its last entry.
+            timestamps = self._timestamps.get(project)
+            indices = self.state.projects_dict[project]["indices"]
+            if timestamps is None:
+                return
+            if not indices or indices[-1] != img_index or len(timestamps) not in (len(indices) - 1, len(indices)):
+                self._timestamps.pop(project, None)
+                return
+            if len(timestamps) == len(indices):
+                timestamps.pop()  # Estimated by a lookup between the capture and this call.
+            timestamps.append(max(elapsed_seconds, timestamps[-1]) if timestamps else elapsed_seconds)
+
+    def frames_changed(self, project: str, removed: list[int]) -> None:
+        """Drops removed frames and schedules reading the timestamps of new ones."""
+        with self._lock:
+            self._timestamps.pop(project, None)
+            if project not in self._known:
+                return
+            for img_index in removed:
+                self._known[project].pop(img_index, None)
+            if removed:
+                # Removals may come with renumbered frames, e.g. from reduce_project_frames.py.
+                self._dirty_projects.add(project)
+                self._unverified_projects.add(project)
+            self.request_update(project)
+
+    def project_removed(self, project: str) -> None:
+        """Forgets a project whose directory was deleted; a running scan of it stops."""
+        with self._lock:
+            self._known.pop(project, None)
+            self._timestamps.pop(project, None)
+            self._dirty_projects.discard(project)
+            self._unverified_projects.discard(project)
+
+    def _load(self, project: str) -> None:
+        """Loads the stored timestamps of a project and queues the missing ones for reading."""
+        if project in self._known:
+            return
+        self._known[project] = self.load_stored(self._project_dir(project))
+        if self._known[project]:
+            self._unverified_projects.add(project)
+        self.request_update(project)
+
+    def _build(self, project: str, indices: list[int], known: dict[int, int]) -> list[int]:
+        """Builds the sorted timestamp array, estimating frames that were not read yet."""
+        delta_seconds = self.project_manager.resolve_frame_delta_seconds(project)
+
+        timestamps: list[int] = []
+        last_known_seconds = 0.0
+        last_known_position = 0
+        for position, img_index in enumerate(indices):
+            seconds = known.get(img_index)
+            if seconds is None:
+                seconds = last_known_seconds + (position - last_known_position) * delta_seconds
+            else:
+                last_known_seconds = seconds
+                last_known_position = position
+            # Clamp to a running maximum so the array stays sorted even across restarts.
+            timestamps.append(max(int(seconds), timestamps[-1]) if timestamps else int(seconds))
+        return timestamps
+
+    def _save(self, project: str) -> None:
+        with self._lock:
+            if self._stopping or project not in self._known:
+                return  # Removed meanwhile, or shutting down; cleanup() saves what was read.
+            stored = dict(self._known[project])
+            self._dirty_projects.discard(project)
+        self.save_stored(self._project_dir(project), stored)
+
+    def _project_dir(self, project: str) -> str:
+        return os.path.join(self.config["projects_folder"], project)
+
+    @classmethod
+    def load_stored(cls, project_dir: str) -> dict[int, int]:
+        """Returns the stored timestamps of a project directory by frame index."""
+        try:
+            stored = np.load(os.path.join(project_dir, cls.FILENAME))
+        except (OSError, ValueError, EOFError):
+            return {}  # Missing or damaged; the timestamps are read from the frames again.
+        if stored.ndim != 1:
+            return {}
+        indices = np.flatnonzero(stored != cls.UNKNOWN_SECONDS)
+        return dict(zip(indices.tolist(), stored[indices].tolist()))
+
+    @classmethod
+    def save_stored(cls, project_dir: str, timestamps: dict[int, int]) -> None:
+        """Writes timestamps as an int32 array by frame index, atomically."""
+        stored = np.full(max(timestamps, default=-1) + 1, cls.UNKNOWN_SECONDS, dtype=np.int32)
+        if timestamps:
+            stored[np.fromiter(timestamps.keys(), np.int64, len(timestamps))] = np.fromiter(
+                timestamps.values(), np.int64, len(timestamps)
+            )
+        path = os.path.join(project_dir, cls.FILENAME)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as stored_file:
+            np.save(stored_file, stored)
+        os.replace(tmp_path, path)
+
+    def _process(self, project: str) -> None:
+        """Reads the timestamp pixels of every frame that is not stored yet."""
+        if project in self._unverified_projects:
+            self._verify(project)
+        with self._lock:
+            known = self._known[project]
+            missing = [index for index in self.state.projects_dict[project]["indices"] if index not in known]
+        if not missing:
+            self._refresh(project)
+            return
+
+        print(f"Indexing timestamps of {len(missing)} frames in project: {project}")
+        base_path = self.project_manager.project_image_base_path(project)
+        for count, img_index in enumerate(missing, start=1):
+            if project not in self._known:
+                return  # Removed meanwhile.
+            seconds = self.project_manager.extract_elapsed_seconds_from_image(
+                f"{base_path}{img_index}{self.JPG_EXTENSION}"
+            )
+            if seconds is not None:
+                with self._lock:
+                    known[img_index] = seconds
+            if count % self.SAVE_EVERY_FRAMES == 0:
+                self._refresh(project)
+                self._save(project)
+        self._refresh(project)
+        self._save(project)
+
+    def _verify(self, project: str) -> None:
+        """Drops the stored timestamps of a project if most sampled frames carry different ones."""
+        with self._lock:
+            self._unverified_projects.discard(project)
+            known = self._known[project]
+            indices = list(self.state.projects_dict[project]["indices"])
+            known_indices = list(known)
+
+        # Entries of frames that no longer exist are stale.
+        stale = set(known_indices).difference(indices)
+        if stale:
+            with self._lock:
+                for img_index in stale:
+                    known.pop(img_index, None)
+                self._dirty_projects.add(project)
+        stored = [index for index in indices if index in known]
+        if not stored:
+            return
+
+        step = max(1, len(stored) // self.VERIFY_SAMPLE_FRAMES)
+        sample = stored[::step][:self.VERIFY_SAMPLE_FRAMES - 1] + stored[-1:]
+        base_path = self.project_manager.project_image_base_path(project)
+        checked = mismatched = 0
+        for img_index in sample:
+            seconds = self.project_manager.extract_elapsed_seconds_from_image(
+                f"{base_path}{img_index}{self.JPG_EXTENSION}"
+            )
+            if seconds is None:
+                continue
+            checked += 1
+            mismatched += seconds != known.get(img_index)
+
+        # A single misread timestamp pixel must not discard the whole project.
+        if mismatched * 2 > checked:
+            print(f"Stored timestamps of project {project} do not match its frames; reading them again.")
+            with self._lock:
+                known.clear()
+                self._timestamps.pop(project, None)
+                self._dirty_projects.add(project)
+
+    def _refresh(self, project: str) -> None:
+        """Rebuilds the array of a project in the worker and swaps it in, keeping lookups fast."""
+        # Built without the lock, so display lookups never wait for it.
+        indices = list(self.state.projects_dict[project]["indices"])
+        timestamps = self._build(project, indices, self._known[project])
+        with self._lock:
+            # A capture or removal meanwhile would misalign it; the next lookup rebuilds then.
+            current = self.state.projects_dict[project]["indices"]
+            if len(current) == len(indices) and current[-1:] == indices[-1:]:
+                self._timestamps[project] = timestamps
+            else:
+                self._timestamps.pop(project, None)
+
+    def flush(self) -> None:
+        """Writes timestamps recorded since the last save."""
+        for project in list(self._dirty_projects):
+            self._save(project)
+
+    def cleanup(self) -> None:
+        """Stops the background worker and saves pending timestamps."""
+        super().cleanup()
+        self.flush()
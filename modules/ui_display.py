@@ -13,11 +13,23 @@ class UIDisplay:
     TIME_DIVISOR_DAYS_HOURS = 10
     TIME_DIVISOR_MINUTES_SECONDS = 4
 
-    def __init__(self, config: dict[str, Any], state: Any) -> None:
+    def __init__(
+        self,
+        config: dict[str, Any],
+        state: Any,
+        project_manager: Any,
+        prefetcher: Any = None,
+        timeline_strip: Any = None,
+        summary_frames: Any = None,
+    ) -> None:
         """Initializes the UI display."""
         self.window_name = "Time Lapse"
         self.config = config
         self.state = state
+        self.project_manager = project_manager
+        self.prefetcher = prefetcher
+        self.timeline_strip = timeline_strip
+        self.summary_frames = summary_frames
 
         # OpenCV window setup
         cv2.namedWindow(self.window_name, cv2.WINDOW_GUI_NORMAL)
@@ -32,6 +44,13 @@ class UIDisplay:
         """Plays the captured images as a time-lapse movie."""
         total_images = len(self.state.img_indices_display)
 
+        if total_images > 0 and self.state.hold_display_frame:
+            # The frame just jumped to (often prefetched) is shown before playback moves on.
+            self.state.hold_display_frame = False
+            self.update_display(max(0, self.state.img_index_display))
+            self.state.key = cv2.waitKey(self.FRAME_DELAY_MS)
+            return
+
         if total_images > 0 and self.state.is_paused:
             if self.state.img_index_display < 0:
                 self.state.img_index_display = 0
@@ -54,7 +73,7 @@ class UIDisplay:
             if frame_step != 0:
                 self.state.frame_advance_accumulator -= frame_step
                 self.state.img_index_display = (self.state.img_index_display + frame_step) % total_images
-            self.update_display(self.state.img_index_display)
+            self.update_display(self.state.img_index_display, abs(frame_step))
 
         self.state.key = cv2.waitKey(self.FRAME_DELAY_MS)
 
@@ -72,6 +91,7 @@ class UIDisplay:
             return
 
         if target_project in self.state.projects:
+            self.state.project_positions[current_project] = max(0, self.state.img_index_display)
             self.state.project_name_display = target_project
             self.state.project_name_display_index = self.state.projects.index(self.state.project_name_display)
             self.state.base_url_display = os.path.join(
@@ -82,15 +102,23 @@ class UIDisplay:
             self.state.img_indices_display = self.state.projects_dict[self.state.project_name_display]["indices"]
 
         self.state.img_index_display = -1
-        self.state.display_frame_delta_seconds = self.state.projects_dict[self.state.project_name_display]["frame_delta_seconds"]
+        self.state.display_frame_delta_seconds = self.project_manager.resolve_frame_delta_seconds(
+            self.state.project_name_display
+        )
         self.state.frame_advance_accumulator = 0.0
         default_index = self.config["default_playback_speed_index"]
         self.state.playback_speed = self.config["playback_speeds"][default_index]
         self.state.is_default_mode = True
         print("Returning to Default")
 
-    def update_display(self, index: int) -> None:
-        """Displays the image at the given index with overlays."""
+        if self.prefetcher is not None:
+            self.prefetcher.prewarm_neighbours()
+
+    def update_display(self, index: int, frame_step: int = 0) -> None:
+        """Displays the image at the given index with overlays.
+
+        At large frame steps, the average of the skipped frames is shown if summary frames are enabled.
+        """
         if not self.state.img_indices_display:
             return
         if index < 0 or index >= len(self.state.img_indices_display):
@@ -98,11 +126,19 @@ class UIDisplay:
 
         retrieved_index = self.state.img_indices_display[index]
         img_filename = f"{self.state.base_url_display}{retrieved_index}.jpg"
-        frame = cv2.imread(img_filename)
+        frame = None
+        if self.summary_frames is not None:
+            frame = self.summary_frames.frame_at(self.state.project_name_display, index, frame_step)
+        if frame is None and self.prefetcher is not None:
+            frame = self.prefetcher.take_frame(img_filename)
+        if frame is None:
+            frame = cv2.imread(img_filename)
 
         if frame is not None:
             ui_element = self._generate_ui_element(frame)
             frame = self._add_ui_overlay(frame, ui_element)
+            if self.timeline_strip is not None:
+                frame = self.timeline_strip.draw(frame, self.state.project_name_display, index)
             cv2.imshow(self.window_name, frame)
 
     def _generate_ui_element(self, frame: Any) -> Any:
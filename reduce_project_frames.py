@@ -17,6 +17,9 @@ from pathlib import Path
 
 JPG_EXT = ".jpg"
 INDEX_RE_TEMPLATE = r"^{prefix}(?P<index>\d+)\.jpg$"
+# Files the program derives from the frames (project catalog, timestamps, timeline strip,
+# summary frames); they describe the old numbering and are rebuilt on the next start.
+DERIVED_FILE_PATTERNS = ("catalog.json", "timestamps.npy", "timeline.jpg", "summary_*.bin")
 
 
 def parse_fraction(value: str) -> tuple[int, int]:
@@ -52,6 +55,10 @@ def collect_project_images(project_dir: Path, prefix: str) -> list[Path]:
     return [path for _, path in indexed_files]
 
 
+def collect_derived_files(project_dir: Path) -> list[Path]:
+    return sorted(path for pattern in DERIVED_FILE_PATTERNS for path in project_dir.glob(pattern) if path.is_file())
+
+
 def should_keep(frame_position: int, delete_num: int, delete_den: int) -> bool:
     keep_per_block = delete_den - delete_num
     return (frame_position % delete_den) < keep_per_block
@@ -90,6 +97,9 @@ def reduce_project_frames(
     print(f"Delete fraction: {delete_num}/{delete_den}")
     print(f"Keep frames: {len(keep_files)}")
     print(f"Delete frames: {len(delete_files)}")
+    derived_files = collect_derived_files(project_dir)
+    if derived_files:
+        print(f"Delete derived files: {', '.join(path.name for path in derived_files)}")
 
     if dry_run:
         print("Dry-run enabled. No files were changed.")
@@ -101,7 +111,8 @@ def reduce_project_frames(
             print("Aborted. No files were changed.")
             return
 
-    for file_path in delete_files:
+    # Derived files go first, so an interrupted run never leaves them describing renumbered frames.
+    for file_path in derived_files + delete_files:
         file_path.unlink()
 
     tmp_token = uuid.uuid4().hex
@@ -4,8 +4,16 @@ from typing import Any
 from pathlib import Path
 
 from modules.camera_capture import CameraCapture
+from modules.diagnostics import Diagnostics
 from modules.program_state import ProgramState
 from modules.project_manager import ProjectManager
+from modules.project_prefetcher import ProjectPrefetcher
+from modules.project_watcher import ProjectWatcher
+from modules.state_journal import StateJournal
+from modules.stream_server import StreamServer
+from modules.summary_frames import SummaryFrames
+from modules.timeline_strip import TimelineStrip
+from modules.timestamp_index import TimestampIndex
 from modules.ui_display import UIDisplay
 
 
@@ -14,6 +22,7 @@ class TimeLapse:
 
     BASE_DIR = Path(__file__).resolve().parent
     LOG_PATH = BASE_DIR / "log.txt"
+    JOURNAL_PATH = BASE_DIR / "state.journal"
     CONFIG_PATH = BASE_DIR / "config.json"
 
     KEY_FORWARD = ord("d")
@@ -21,8 +30,24 @@ class TimeLapse:
     KEY_PAUSE = ord("s")
     KEY_NEXT_PROJECT = ord("e")
     KEY_PREV_PROJECT = ord("w")
+    KEY_SEEK_BACK_HOUR = ord("j")
+    KEY_SEEK_FORWARD_HOUR = ord("l")
+    KEY_SEEK_BACK_DAY = ord("u")
+    KEY_SEEK_FORWARD_DAY = ord("o")
+    KEY_SEEK_START = ord("z")
+    KEY_SEEK_END = ord("x")
+    KEY_SEEK_NEXT_ACTIVE = ord("n")
     KEY_ESCAPE = 27
 
+    SECONDS_PER_HOUR = 3600
+    SECONDS_PER_DAY = 86400
+    SEEK_KEY_OFFSETS = {
+        KEY_SEEK_BACK_HOUR: -SECONDS_PER_HOUR,
+        KEY_SEEK_FORWARD_HOUR: SECONDS_PER_HOUR,
+        KEY_SEEK_BACK_DAY: -SECONDS_PER_DAY,
+        KEY_SEEK_FORWARD_DAY: SECONDS_PER_DAY,
+    }
+
     REQUIRED_CONFIG_KEYS = {
         "width",
         "height",
@@ -50,18 +75,64 @@ class TimeLapse:
         self.state.program_start_time = time.time()
 
         # Submodules
+        self.state_journal = StateJournal(self.JOURNAL_PATH, self.config)
         self.project_manager = ProjectManager(self.config, self.state)
-        self.ui_display = UIDisplay(self.config, self.state)
+        self.project_prefetcher = ProjectPrefetcher(self.config, self.state, self.project_manager)
+        self.timestamp_index = TimestampIndex(self.config, self.state, self.project_manager)
+        self.timeline_strip = (
+            TimelineStrip(self.config, self.state, self.project_manager, self.timestamp_index)
+            if self.config.get("timeline_strip")
+            else None
+        )
+        self.summary_frames = (
+            SummaryFrames(self.config, self.state, self.project_manager, self.timestamp_index)
+            if self.config.get("temporal_average_preview")
+            else None
+        )
+        self.ui_display = UIDisplay(
+            self.config,
+            self.state,
+            self.project_manager,
+            self.project_prefetcher,
+            self.timeline_strip,
+            self.summary_frames,
+        )
         self.camera_capture = CameraCapture(self.config, self.state)
+        self.diagnostics = Diagnostics(self.config, self.state, self.BASE_DIR)
+        self.stream_server = StreamServer(self.config, self.state) if self.config.get("stream_server") else None
 
         # Timing and playback controls
         self.last_capture_time = self.state.program_start_time - self.config["capture_interval"]
         self.state.last_keypress = time.time()
 
         # Initialize project and state
-        self.read_log_file()
+        self.read_state_journal()
         self.project_manager.setup()
-        self.write_log_file()
+        self.write_state_journal()
+        self.state_journal.flush()
+        self.project_prefetcher.prewarm_neighbours()
+        self.project_watcher = (
+            ProjectWatcher(self.config, self.state, self.project_manager, self._frame_listeners())
+            if self.config.get("watch_projects", True)
+            else None
+        )
+        if self.stream_server is not None:
+            try:
+                self.stream_server.start()
+            except (OSError, RuntimeError) as exc:
+                # The stream is an optional viewer; recording and display go on without it.
+                print(f"Error: Stream server disabled: {exc}")
+                self.stream_server.cleanup()
+                self.stream_server = None
+
+    def _frame_listeners(self) -> list[Any]:
+        """Returns the modules that cache per-project frame data and follow changes on disk."""
+        listeners: list[Any] = [self.timestamp_index]
+        if self.timeline_strip is not None:
+            listeners.append(self.timeline_strip)
+        if self.summary_frames is not None:
+            listeners.append(self.summary_frames)
+        return listeners
 
     def _validate_config(self) -> None:
         missing_keys = self.REQUIRED_CONFIG_KEYS.difference(self.config)
@@ -90,6 +161,10 @@ class TimeLapse:
             projects_folder = self.BASE_DIR / projects_folder
         self.config["projects_folder"] = str(projects_folder)
 
+        source_path = self.config.get("capture_source_path")
+        if source_path and not Path(source_path).is_absolute():
+            self.config["capture_source_path"] = str(self.BASE_DIR / source_path)
+
     def _project_image_base_path(self, project_name: str) -> str:
         return self.project_manager.project_image_base_path(project_name)
 
@@ -131,8 +206,71 @@ class TimeLapse:
         new_speed, _ = levels[new_level_index]
         self.state.playback_speed = new_speed
 
-    def read_log_file(self) -> None:
-        """Reads the log file to resume the last session's state."""
+    def _select_display_project(self, project_index: int) -> None:
+        """Switches playback to another project, resuming where it was left."""
+        if self.state.project_name_display is not None:
+            self.state.project_positions[self.state.project_name_display] = max(0, self.state.img_index_display)
+
+        self.state.project_name_display_index = project_index
+        self.state.project_name_display = self.state.projects[project_index]
+        self.state.img_index_display = self.project_prefetcher.resume_position(self.state.project_name_display)
+        self.state.img_indices_display = self.state.projects_dict[self.state.project_name_display]["indices"]
+        self.state.display_frame_delta_seconds = self.project_manager.resolve_frame_delta_seconds(
+            self.state.project_name_display
+        )
+        self.state.frame_advance_accumulator = 0.0
+        print(f"Selected project: {self.state.project_name_display}")
+        self.state.base_url_display = self._project_image_base_path(self.state.project_name_display)
+
+        # Show the prefetched resume frame on this tick instead of stepping away from it.
+        self.state.hold_display_frame = True
+
+        # Warm the projects that are now one key press away.
+        self.project_prefetcher.prewarm_neighbours()
+
+    def seek_to_position(self, position: int) -> None:
+        """Jumps playback to a list position and decodes only that frame."""
+        total_images = len(self.state.img_indices_display)
+        if total_images == 0:
+            return
+        self.state.img_index_display = max(0, min(position, total_images - 1))
+        self.state.frame_advance_accumulator = 0.0
+        self.state.hold_display_frame = True
+
+    def seek_to_elapsed(self, elapsed_seconds: float) -> None:
+        """Jumps playback to the frame closest to an absolute elapsed time of the project."""
+        position = self.timestamp_index.position_for_elapsed(self.state.project_name_display, elapsed_seconds)
+        self.seek_to_position(position)
+
+    def seek_relative(self, delta_seconds: float) -> None:
+        """Jumps playback by a time offset relative to the displayed frame."""
+        current_seconds = self.timestamp_index.elapsed_at(
+            self.state.project_name_display, max(0, self.state.img_index_display)
+        )
+        self.seek_to_elapsed(current_seconds + delta_seconds)
+
+    def seek_next_active(self) -> None:
+        """Jumps to the next part of the project with above-typical change, based on the timeline strip."""
+        if self.timeline_strip is None:
+            return
+        current_seconds = self.timestamp_index.elapsed_at(
+            self.state.project_name_display, max(0, self.state.img_index_display)
+        )
+        target_seconds = self.timeline_strip.next_active_elapsed(self.state.project_name_display, current_seconds)
+        if target_seconds is not None:
+            self.seek_to_elapsed(target_seconds)
+
+    def read_state_journal(self) -> None:
+        """Resumes the last session's state from the journal, or from a legacy log file."""
+        recovered = self.state_journal.recover()
+        if recovered is not None:
+            (
+                self.state.project_name_record,
+                self.state.img_index_record,
+                self.state.program_start_time,
+            ) = recovered
+            return
+
         try:
             with open(self.LOG_PATH, "r", encoding="utf-8") as log_file:
                 project_name = log_file.readline().strip()
@@ -142,14 +280,13 @@ class TimeLapse:
         except (FileNotFoundError, ValueError):
             print("Log file missing or invalid. Starting with default values.")
 
-    def write_log_file(self) -> None:
-        """Writes the current state to the log file."""
-        with open(self.LOG_PATH, "w", encoding="utf-8") as log_file:
-            log_file.write(
-                f"{self.state.project_name_record}\n"
-                f"{self.state.img_index_record}\n"
-                f"{self.state.program_start_time}"
-            )
+    def write_state_journal(self) -> None:
+        """Queues the current state in the journal; it reaches disk within the durability window."""
+        self.state_journal.record(
+            self.state.project_name_record,
+            self.state.img_index_record,
+            self.state.program_start_time,
+        )
 
     def handle_key_press(self) -> bool:
         """Handles key press events for playback control."""
@@ -170,16 +307,21 @@ class TimeLapse:
             self.state.last_keypress = time.time()
             self.state.is_default_mode = False
             step = 1 if key == self.KEY_NEXT_PROJECT else -1
-            self.state.project_name_display_index = (
-                self.state.project_name_display_index + step
-            ) % len(self.state.projects)
-            self.state.project_name_display = self.state.projects[self.state.project_name_display_index]
-            self.state.img_index_display = -1
-            self.state.img_indices_display = self.state.projects_dict[self.state.project_name_display]["indices"]
-            self.state.display_frame_delta_seconds = self.state.projects_dict[self.state.project_name_display]["frame_delta_seconds"]
-            self.state.frame_advance_accumulator = 0.0
-            print(f"Selected project: {self.state.project_name_display}")
-            self.state.base_url_display = self._project_image_base_path(self.state.project_name_display)
+            self._select_display_project(
+                (self.state.project_name_display_index + step) % len(self.state.projects)
+            )
+        elif key in self.SEEK_KEY_OFFSETS:
+            self.state.last_keypress = time.time()
+            self.state.is_default_mode = False
+            self.seek_relative(self.SEEK_KEY_OFFSETS[key])
+        elif key in [self.KEY_SEEK_START, self.KEY_SEEK_END]:
+            self.state.last_keypress = time.time()
+            self.state.is_default_mode = False
+            self.seek_to_position(0 if key == self.KEY_SEEK_START else len(self.state.img_indices_display) - 1)
+        elif key == self.KEY_SEEK_NEXT_ACTIVE:
+            self.state.last_keypress = time.time()
+            self.state.is_default_mode = False
+            self.seek_next_active()
         elif key == self.KEY_ESCAPE:
             print("Quitting program.")
             return False
@@ -197,30 +339,44 @@ class TimeLapse:
                 elapsed_time = int(time.time() - self.state.program_start_time)
                 saved = self.camera_capture.capture_image(elapsed_time)
                 if saved:
-                    captured_index = self.state.img_index_record
-                    if captured_index not in self.state.img_indices_record:
-                        self.state.img_indices_record.append(captured_index)
-
-                    if self.state.project_name_display == self.state.project_name_record:
-                        if (
-                            self.state.img_indices_display is not self.state.img_indices_record
-                            and captured_index not in self.state.img_indices_display
-                        ):
-                            self.state.img_indices_display.append(captured_index)
-
-                    self.state.img_index_record += 1
-                    self.write_log_file()
+                    captured_index = self.project_manager.record_captured_frame()
+                    self.timestamp_index.record_capture(self.state.project_name_record, captured_index, elapsed_time)
+                    if self.timeline_strip is not None:
+                        self.timeline_strip.frame_captured(self.state.project_name_record)
+                    if self.summary_frames is not None:
+                        self.summary_frames.frame_captured(self.state.project_name_record)
+                    self.write_state_journal()
 
                 self.last_capture_time = time.time()
 
+            # Pick up projects and frames added or removed on disk
+            if self.project_watcher is not None:
+                self.project_watcher.apply_pending()
+
             # Playback
             self.ui_display.play_movie()
             self.ui_display.return_to_default()
 
+            # Profiling and memory snapshots requested by signal
+            self.diagnostics.poll()
+            self.state_journal.poll()
+
     def cleanup(self) -> None:
         """Cleans up resources."""
+        self.diagnostics.cleanup()
+        if self.project_watcher is not None:
+            self.project_watcher.cleanup()
+        self.project_prefetcher.cleanup()
+        if self.timeline_strip is not None:
+            self.timeline_strip.cleanup()
+        if self.summary_frames is not None:
+            self.summary_frames.cleanup()
+        self.timestamp_index.cleanup()
+        if self.stream_server is not None:
+            self.stream_server.cleanup()
         self.camera_capture.cleanup()
         self.ui_display.cleanup()
+        self.state_journal.cleanup()
 
 
 if __name__ == "__main__":
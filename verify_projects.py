@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""Verify the frames of projects and optionally repair them.
+
+Every frame first gets a fast structural check (file size, JPEG start/end
+markers and header segments) without decoding. Only suspects are fully
+decoded. Stored timestamps are checked for backward jumps and large gaps.
+
+With --repair, bad frames are moved into a 'quarantine' folder inside the
+project (no renumbering) and the stored timestamps and project catalog
+are rebuilt from the remaining frames.
+
+Example:
+    python3 verify_projects.py                       # verify all projects
+    python3 verify_projects.py default --repair
+    python3 verify_projects.py default --full --read-timestamps --workers 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import cv2
+
+from modules.project_catalog import ProjectCatalog
+from modules.project_manager import ProjectManager
+from modules.timestamp_index import TimestampIndex
+
+
+BASE_DIR = Path(__file__).resolve().parent
+CONFIG_PATH = BASE_DIR / "config.json"
+INDEX_RE_TEMPLATE = r"^{prefix}(?P<index>\d+)\.jpg$"
+QUARANTINE_DIRNAME = "quarantine"
+
+JPEG_SOI = b"\xff\xd8"
+JPEG_EOI = b"\xff\xd9"
+JPEG_SOS_MARKER = 0xDA
+HEAD_BYTES = 64 * 1024
+TAIL_BYTES = 64
+CHUNK_SIZE = 256
+GAP_FACTOR = 10
+MAX_REPORTED_DISCONTINUITIES = 20
+
+STATUS_OK = "ok"
+STATUS_EMPTY = "empty"
+STATUS_BAD_HEADER = "bad_header"
+STATUS_TRUNCATED = "truncated"
+STATUS_UNDECODABLE = "undecodable"
+
+
+def check_jpeg_structure(path: str) -> tuple[str, int]:
+    """Checks the JPEG markers of a file without decoding it; returns (status, size).
+
+    A missing end marker is reported as truncated even if the header is damaged too,
+    so a decode can only clear a bad header, never a cut-off file.
+    """
+    size = os.path.getsize(path)
+    if size == 0:
+        return STATUS_EMPTY, size
+
+    with open(path, "rb") as image_file:
+        head = image_file.read(HEAD_BYTES)
+        image_file.seek(max(0, size - TAIL_BYTES))
+        tail = image_file.read()
+
+    # Power cuts leave files cut short or padded with zeros after the data written so far.
+    if not tail.rstrip(b"\0").endswith(JPEG_EOI):
+        return STATUS_TRUNCATED, size
+    if not head.startswith(JPEG_SOI):
+        return STATUS_BAD_HEADER, size
+
+    # Walk the header segments up to the start of scan.
+    offset = len(JPEG_SOI)
+    while offset + 4 <= len(head):
+        if head[offset] != 0xFF:
+            return STATUS_BAD_HEADER, size
+        marker = head[offset + 1]
+        if marker == 0xFF:  # Fill byte
+            offset += 1
+            continue
+        if marker == JPEG_SOS_MARKER:
+            break
+        offset += 2 + int.from_bytes(head[offset + 2:offset + 4], "big")
+    else:
+        if size <= len(head):
+            return STATUS_TRUNCATED, size  # The whole file ends before any image data.
+    return STATUS_OK, size
+
+
+def check_frame(task: tuple[int, str, bool, bool, int]) -> tuple[int, str, int, int | None]:
+    """Checks one frame; returns (index, status, size, elapsed seconds or None)."""
+    index, path, full_decode, read_timestamp, pixels_for_timestamp = task
+    try:
+        status, size = check_jpeg_structure(path)
+    except OSError:
+        return index, STATUS_UNDECODABLE, 0, None
+
+    needs_decode = status in (STATUS_BAD_HEADER, STATUS_TRUNCATED) or full_decode or read_timestamp
+    if status == STATUS_EMPTY or not needs_decode:
+        return index, status, size, None
+
+    # A reduced decode still reads all image data, but skips most of the inverse DCT.
+    scale, flag = (1, cv2.IMREAD_COLOR) if full_decode else ProjectManager.timestamp_decode(pixels_for_timestamp)
+    frame = cv2.imread(path, flag)
+    if frame is None:
+        return index, STATUS_UNDECODABLE, size, None
+    if status == STATUS_BAD_HEADER:
+        status = STATUS_OK  # Unusual header with an intact end, and the decoder accepts it.
+    return index, status, size, ProjectManager.elapsed_seconds_from_frame(frame, pixels_for_timestamp, scale)
+
+
+def _init_worker() -> None:
+    cv2.setNumThreads(1)
+
+
+def collect_project_indices(project_dir: Path, prefix: str) -> list[int]:
+    index_re = re.compile(INDEX_RE_TEMPLATE.format(prefix=re.escape(prefix)))
+    indices = []
+    with os.scandir(project_dir) as entries:
+        for entry in entries:
+            match = index_re.match(entry.name)
+            if match and entry.is_file():
+                indices.append(int(match.group("index")))
+    indices.sort()
+    return indices
+
+
+def find_discontinuities(timestamps: dict[int, int]) -> tuple[float | None, list[str]]:
+    """Returns the typical frame delta and descriptions of backward jumps and large gaps."""
+    indices = sorted(timestamps)
+    deltas = [
+        (timestamps[second] - timestamps[first]) / (second - first)
+        for first, second in zip(indices, indices[1:])
+    ]
+    positive_deltas = [delta for delta in deltas if delta > 0]
+    if not positive_deltas:
+        return None, []
+
+    median_delta = statistics.median(positive_deltas)
+    problems = []
+    for first, second in zip(indices, indices[1:]):
+        jump = timestamps[second] - timestamps[first]
+        if jump < 0:
+            problems.append(f"time goes back {-jump} s between frames {first} and {second}")
+        elif jump > GAP_FACTOR * median_delta * (second - first):
+            problems.append(f"gap of {jump} s between frames {first} and {second}")
+    return median_delta, problems
+
+
+def quarantine_frames(project_dir: Path, prefix: str, indices: list[int]) -> None:
+    quarantine_dir = project_dir / QUARANTINE_DIRNAME
+    quarantine_dir.mkdir(exist_ok=True)
+    for index in indices:
+        name = f"{prefix}{index}.jpg"
+        target = quarantine_dir / name
+        if target.exists():
+            target = quarantine_dir / f"{prefix}{index}_{int(time.time())}.jpg"
+        os.replace(project_dir / name, target)
+
+
+def verify_project(
+    pool: ProcessPoolExecutor,
+    project_dir: Path,
+    prefix: str,
+    pixels_for_timestamp: int,
+    full_decode: bool,
+    read_timestamps: bool,
+    keep_truncated: bool,
+    repair: bool,
+) -> None:
+    start_time = time.perf_counter()
+    timestamps = TimestampIndex.load_stored(str(project_dir))
+
+    indices = collect_project_indices(project_dir, prefix)
+    tasks = [
+        (index, str(project_dir / f"{prefix}{index}.jpg"), full_decode, read_timestamps and index not in timestamps, pixels_for_timestamp)
+        for index in indices
+    ]
+
+    status_counts: dict[str, int] = {}
+    bad_indices = []
+    total_bytes = 0
+    for index, status, size, elapsed_seconds in pool.map(check_frame, tasks, chunksize=CHUNK_SIZE):
+        status_counts[status] = status_counts.get(status, 0) + 1
+        total_bytes += size
+        is_bad = status in (STATUS_EMPTY, STATUS_UNDECODABLE) or (status == STATUS_TRUNCATED and not keep_truncated)
+        if is_bad:
+            bad_indices.append(index)
+            timestamps.pop(index, None)
+        elif elapsed_seconds is not None:
+            timestamps[index] = elapsed_seconds
+
+    # Stored timestamps of frames that no longer exist are stale.
+    existing = set(indices) - set(bad_indices)
+    timestamps = {index: seconds for index, seconds in timestamps.items() if index in existing}
+    median_delta, problems = find_discontinuities(timestamps)
+    total_seconds = time.perf_counter() - start_time
+
+    print(f"Project: {project_dir}")
+    print(f"Frames: {len(indices)} | " + ", ".join(f"{status}: {count}" for status, count in sorted(status_counts.items())))
+    print(f"Checked in {total_seconds:.1f} s ({len(indices) / max(total_seconds, 1e-9):.0f} frames/s, "
+          f"{total_bytes / max(total_seconds, 1e-9) / 1e6:.1f} MB/s)")
+    if bad_indices:
+        print(f"Bad frames: {bad_indices[:MAX_REPORTED_DISCONTINUITIES]}{' ...' if len(bad_indices) > MAX_REPORTED_DISCONTINUITIES else ''}")
+    if timestamps:
+        print(f"Timestamps known for {len(timestamps)} frames, typical delta: "
+              f"{'unknown' if median_delta is None else f'{median_delta:.1f} s'}")
+    for problem in problems[:MAX_REPORTED_DISCONTINUITIES]:
+        print(f"  Discontinuity: {problem}")
+    if len(problems) > MAX_REPORTED_DISCONTINUITIES:
+        print(f"  ... and {len(problems) - MAX_REPORTED_DISCONTINUITIES} more discontinuities")
+
+    if not repair:
+        return
+
+    if bad_indices:
+        quarantine_frames(project_dir, prefix, bad_indices)
+        print(f"Moved {len(bad_indices)} bad frames to {project_dir / QUARANTINE_DIRNAME}")
+
+    TimestampIndex.save_stored(str(project_dir), timestamps)
+    if median_delta is not None and existing:
+        ProjectCatalog(str(project_dir.parent)).update(
+            project_dir.name, **ProjectCatalog.frame_delta_values(median_delta, sorted(existing))
+        )
+    print("Timestamps and catalog rebuilt.")
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Check project frames for corruption and timestamp discontinuities, and optionally repair them."
+    )
+    parser.add_argument(
+        "projects",
+        nargs="*",
+        help="Project names inside the projects folder, or paths to project directories (default: all projects).",
+    )
+    parser.add_argument(
+        "--projects-folder",
+        help="Base folder for projects (default: projects_folder from config.json).",
+    )
+    parser.add_argument(
+        "--prefix",
+        default="image_",
+        help="Image filename prefix (default: image_).",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Decode every frame instead of only the suspects.",
+    )
+    parser.add_argument(
+        "--read-timestamps",
+        action="store_true",
+        help="Decode frames without a stored timestamp to read it (slow on large projects).",
+    )
+    parser.add_argument(
+        "--keep-truncated",
+        action="store_true",
+        help="Keep truncated frames that still decode instead of treating them as bad.",
+    )
+    parser.add_argument(
+        "--repair",
+        action="store_true",
+        help="Quarantine bad frames and rebuild the stored timestamps and project catalog.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Number of worker processes (default: number of CPUs).",
+    )
+    return parser
+
+
+def main() -> int:
+    parser = build_arg_parser()
+    args = parser.parse_args()
+
+    with open(CONFIG_PATH, "r", encoding="utf-8") as config_file:
+        config: dict[str, Any] = json.load(config_file)
+
+    projects_folder = Path(args.projects_folder or config["projects_folder"])
+    if not projects_folder.is_absolute():
+        projects_folder = BASE_DIR / projects_folder
+
+    if args.projects:
+        project_dirs = [
+            Path(project).resolve() if Path(project).exists() else (projects_folder / project).resolve()
+            for project in args.projects
+        ]
+    else:
+        project_dirs = sorted(entry for entry in projects_folder.iterdir() if entry.is_dir())
+    for project_dir in project_dirs:
+        if not project_dir.is_dir():
+            parser.error(f"Project path is not a directory: {project_dir}")
+
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker) as pool:
+        for project_dir in project_dirs:
+            verify_project(
+                pool=pool,
+                project_dir=project_dir,
+                prefix=args.prefix,
+                pixels_for_timestamp=config["pixels_for_timestamp"],
+                full_decode=args.full,
+                read_timestamps=args.read_timestamps,
+                keep_truncated=args.keep_truncated,
+                repair=args.repair,
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())